@@ -1,12 +1,61 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./smartfinance.db"
+    async_database: bool = False  # Serve all endpoints through an AsyncEngine (aiosqlite/asyncpg)
+    read_database_url: Optional[str] = None  # Dashboard read pool; defaults to database_url
+    web_concurrency: int = 1  # Server worker processes (WEB_CONCURRENCY, also read by uvicorn and gunicorn)
+    db_max_connections: Optional[int] = None  # Connection budget split across workers; overrides overflow
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # Seconds to wait for a pooled connection
+    db_pool_recycle: int = 1800  # Seconds before a connection is replaced; -1 disables
+    db_pool_pre_ping: bool = True
+    sqlite_wal: bool = True
+    sqlite_synchronous: str = "NORMAL"  # OFF, NORMAL, FULL or EXTRA
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size: int = 268435456  # Bytes; 0 disables memory-mapped I/O
+    auto_migrate: bool = True  # Apply pending migrations at startup; otherwise run 'python migrate.py'
+    migrate_lock_timeout_seconds: int = 120  # Wait for another process's migration before giving up
+    slow_query_ms: float = 200  # Log statements slower than this (SQL text only); 0 disables
+    metrics_enabled: bool = True  # Server-Timing headers and /api/metrics
     secret_key: str = "smartfinance-secret-key-2024"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 43200  # 30 days
+    token_cache_size: int = 4096  # Decoded tokens kept by hash; 0 disables
+    token_cache_ttl_seconds: int = 300
+    user_cache_size: int = 1024  # ORM users for get_current_user; 0 disables
+    user_cache_ttl_seconds: int = 0  # Off by default: cached users are detached snapshots
+    dashboard_cache_size: int = 4096  # Cached dashboard responses (in-process backend); 0 disables
+    dashboard_cache_ttl_seconds: int = 300
+    dashboard_cache_url: Optional[str] = None  # e.g. redis://localhost:6379/0 to share across processes
+    dashboard_max_buckets: int = 3700  # Longest time series served, about ten years of days
+    analytics_cache_mb: float = 0  # Per-process budget for columnar dashboard snapshots; 0 disables
+    dashboard_events_url: Optional[str] = None  # e.g. redis://localhost:6379/0 to push updates across processes
+    dashboard_events_queue_size: int = 64  # Undelivered events per stream before it is told to resync
+    dashboard_stream_heartbeat_seconds: float = 15  # Keep-alive comment on idle streams
+    password_hash_rounds: int = 29000  # pbkdf2_sha256 rounds for new hashes
+    password_hash_executor: str = "thread"  # 'thread' or 'process'
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32  # Queued + running hash jobs before 503
+    transactions_page_size: int = 50
+    transactions_max_page_size: int = 500
+    fast_serialization: bool = False  # Encode transaction lists from row tuples, skipping per-row models
+    search_rank_max_matches: int = 2000  # Searches matching more of the user's rows are ordered by date instead of bm25
+    batch_max_operations: int = 1000  # Operations accepted by /api/transactions/batch
+    import_batch_size: int = 5000  # Rows per INSERT/commit in bulk imports
+    import_max_errors: int = 1000  # Per-row errors reported back by a bulk import
+    archive_keep_years: int = 3  # Calendar years kept in the hot transactions table, this one included
+    archive_chunk_size: int = 5000  # Rows moved per commit by archive.py
+    archive_catalog_ttl_seconds: float = 30  # How long processes may route reads on a stale list of archives
+    account_delete_inline_rows: int = 5000  # Larger accounts are purged in the background
+    account_purge_chunk_size: int = 2000  # Rows per DELETE/commit in a background purge
+    account_purge_pause_ms: float = 10  # Gap between chunks so other writers get the database
+    account_purge_stale_seconds: int = 60  # Unfinished purges idle this long are resumed at startup
 
     class Config:
         env_file = ".env"
@@ -1,25 +1,357 @@
-from sqlalchemy import create_engine
+import asyncio
+import os
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, Optional, Tuple
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
+from app.services.metrics import instrument_engine
 
-# Create database engine with SQLite-compatible settings
-if settings.database_url.startswith("sqlite"):
-    engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(settings.database_url)
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+
+
+def pool_limits() -> Tuple[int, int]:
+    """(pool_size, max_overflow) for one process's pool.
+
+    With DB_MAX_CONNECTIONS set, that budget is shared by WEB_CONCURRENCY
+    worker processes and each worker's pool gets an equal slice; otherwise
+    DB_POOL_SIZE and DB_MAX_OVERFLOW apply to every process as given.
+    """
+    if settings.db_max_connections:
+        per_worker = max(1, settings.db_max_connections // max(1, settings.web_concurrency))
+        pool_size = min(settings.db_pool_size, per_worker)
+        return pool_size, per_worker - pool_size
+    return settings.db_pool_size, settings.db_max_overflow
+
+
+def engine_options(url: str) -> dict:
+    """Pool and driver options for an engine on this URL, from Settings."""
+    options = {}
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(url):
+            # In-memory SQLite uses a singleton/static pool that takes no sizing
+            return options
+    pool_size, max_overflow = pool_limits()
+    options.update(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return options
+
+
+def _sqlite_pragmas(read_only: bool = False):
+    """Build a connect listener applying the SQLite performance profile."""
+    synchronous = settings.sqlite_synchronous.upper()
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"sqlite_synchronous must be one of {sorted(SQLITE_SYNCHRONOUS_MODES)}")
+
+    def apply(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        if settings.sqlite_wal and not read_only:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        # Off by default in SQLite; needed for ON DELETE CASCADE
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return apply
+
+
+def pool_capacity(url: str) -> Optional[int]:
+    """Most connections the engine on this URL can hand out, or None if unbounded."""
+    pool_size, max_overflow = pool_limits()
+    if "pool_size" not in engine_options(url) or max_overflow < 0:
+        return None
+    return pool_size + max_overflow
+
+
+class PoolGate:
+    """Admits at most `capacity` request sessions on one sync pool at a time.
+
+    A sync session keeps its connection across threadpool hops (handler, then
+    dependency teardown). Without a bound, workers can all block waiting on an
+    exhausted pool while the requests holding connections wait for a worker.
+    Waiting here happens on the event loop instead, so a worker is only used
+    once a connection is guaranteed to be available.
+    """
+
+    def __init__(self, capacity: Optional[int]):
+        self.capacity = capacity
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.capacity is None:
+            yield
+            return
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.capacity)
+        async with semaphore:
+            yield
+
+
+def ids_never_reused(conn: Connection, table_name: str) -> bool:
+    """Whether the table never hands out a deleted row's id again.
+
+    Sequences never do. SQLite needs AUTOINCREMENT; without it the next id is
+    max(id) + 1, which repeats the id of a deleted newest row.
+    """
+    if conn.dialect.name != "sqlite":
+        return True
+    sql = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table_name}
+    ).scalar()
+    return "AUTOINCREMENT" in (sql or "").upper()
+
+
+def build_engine(url: str, read_only: bool = False):
+    """Create a sync engine with pool settings and, for SQLite, the pragma profile."""
+    new_engine = create_engine(url, **engine_options(url))
+    if _is_sqlite(url):
+        event.listen(new_engine, "connect", _sqlite_pragmas(read_only))
+    instrument_engine(new_engine)
+    return new_engine
+
+
+# Create database engine with pool and SQLite settings
+engine = build_engine(settings.database_url)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+write_gate = PoolGate(pool_capacity(settings.database_url))
+
+# Separate read-only pool for dashboard queries: a replica when configured,
+# otherwise the same SQLite file opened with query_only connections
+if settings.read_database_url:
+    read_engine = build_engine(settings.read_database_url, read_only=True)
+    read_gate = PoolGate(pool_capacity(settings.read_database_url))
+elif _is_sqlite(settings.database_url) and not _is_memory_sqlite(settings.database_url):
+    read_engine = build_engine(settings.database_url, read_only=True)
+    read_gate = PoolGate(pool_capacity(settings.database_url))
+else:
+    read_engine = engine
+    read_gate = write_gate
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL onto the matching asyncio driver."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+# Async engine, only built when async_database is enabled (needs greenlet)
+if settings.async_database:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        async_database_url(settings.database_url), **engine_options(settings.database_url)
+    )
+    if _is_sqlite(settings.database_url):
+        event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas())
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+
+def _dispose_pools_after_fork():
+    """Forget pooled connections inherited from the parent process.
+
+    Engines are built at import, so a server that imports the app and then
+    forks workers (gunicorn --preload) hands every child the same sockets and
+    SQLite handles. close=False leaves them for the parent; each worker opens
+    its own connections on first use.
+    """
+    for pooled in {engine, read_engine}:
+        pooled.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_pools_after_fork)
 
 # Base class for models
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """Dependency to get database session."""
-    db = SessionLocal()
+    async with write_gate.slot():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+
+async def get_read_db():
+    """Dependency to get a session on the read-only pool."""
+    async with read_gate.slot():
+        db = ReadSessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+
+class SessionRunner:
+    """Runs sync ORM functions, fn(session, *args), without blocking the event loop."""
+
+    async def run(self, fn, *args, **kwargs):
+        raise NotImplementedError
+
+
+class ThreadSessionRunner(SessionRunner):
+    """Sync engine: run the function on Starlette's threadpool."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+class AsyncSessionRunner(SessionRunner):
+    """Async engine: run the function through AsyncSession.run_sync on the async driver."""
+
+    def __init__(self, session: "AsyncSession"):
+        self.session = session
+
+    async def run(self, fn, *args, **kwargs):
+        return await self.session.run_sync(fn, *args, **kwargs)
+
+
+def _runner_dependency(session_dependency):
+    if settings.async_database:
+        # The async pool waits on the event loop, so no gate or sync session is needed
+        async def dependency():
+            async with AsyncSessionLocal() as session:
+                yield AsyncSessionRunner(session)
+    else:
+        async def dependency(db: Session = Depends(session_dependency)):
+            yield ThreadSessionRunner(db)
+    return dependency
+
+
+get_db_runner = _runner_dependency(get_db)
+get_db_runner.__doc__ = """Dependency for async handlers; uses the async engine when async_database is set.
+
+In sync mode the runner wraps the request's get_db session, so handlers
+and dependencies mixing both still share one session.
+"""
+
+get_read_db_runner = _runner_dependency(get_read_db)
+get_read_db_runner.__doc__ = """Like get_db_runner, but on the read-only pool in sync mode."""
+
+
+@asynccontextmanager
+async def db_runner():
+    """A SessionRunner on the write pool, scoped to a block rather than a request.
+    
+    For handlers that spend most of their time on something other than the
+    database, such as reading an upload, and should hold a connection (and a
+    gate slot) only while they write.
+    """
+    if settings.async_database:
+        async with AsyncSessionLocal() as session:
+            yield AsyncSessionRunner(session)
+        return
+    async with write_gate.slot():
+        db = SessionLocal()
+        try:
+            yield ThreadSessionRunner(db)
+        finally:
+            await run_in_threadpool(db.close)
+
+
+@asynccontextmanager
+async def read_db_runner():
+    """A read SessionRunner scoped to a block rather than a request.
+    
+    For long-lived responses such as event streams, which should hold a
+    connection only while they query, not for as long as the client listens.
+    """
+    if settings.async_database:
+        async with AsyncSessionLocal() as session:
+            yield AsyncSessionRunner(session)
+        return
+    async with read_gate.slot():
+        db = ReadSessionLocal()
+        try:
+            yield ThreadSessionRunner(db)
+        finally:
+            await run_in_threadpool(db.close)
+
+
+class QueryCounter:
+    """Collects the SQL statements executed while a count_queries block is active."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(bind=None):
+    """Test hook: count SQL statements issued against the engines inside the block.
+
+        with count_queries() as counter:
+            client.get("/api/transactions/", headers=headers)
+        assert counter.count <= 2
+    """
+    if bind is not None:
+        binds = [bind]
+    else:
+        binds = [engine]
+        if read_engine is not engine:
+            binds.append(read_engine)
+        if async_engine is not None:
+            binds.append(async_engine.sync_engine)
+    counter = QueryCounter()
+    for target in binds:
+        event.listen(target, "before_cursor_execute", counter)
     try:
-        yield db
+        yield counter
     finally:
-        db.close()
+        for target in binds:
+            event.remove(target, "before_cursor_execute", counter)
@@ -1,30 +1,88 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import settings
+from app.database import SessionRunner, get_db_runner
 from app.models.user import User
-from app.services.auth import decode_token
+from app.schemas.user import Principal
+from app.services.auth import decode_token_cached
+from app.services.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
+# Detached User snapshots for get_current_user (disabled unless user_cache_ttl_seconds > 0)
+user_cache = TTLCache(settings.user_cache_size, settings.user_cache_ttl_seconds)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from the JWT token."""
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    user_id = decode_token(token)
+
+
+def _load_user(db: Session, user_id: int):
+    user = db.get(User, user_id)
+    if user is not None and user.deleted_at is not None:
+        # Account is being purged in the background
+        return None
+    if user is not None and user_cache.enabled:
+        # Detach so the snapshot can be shared safely across sessions
+        db.expunge(user)
+        user_cache.set(user_id, user)
+    return user
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Get the caller from the verified JWT claims alone (no database query).
+
+    Use this for handlers that only need the user's id.
+    """
+    user_id = decode_token_cached(token)
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return Principal(id=user_id)
+
+
+async def get_stream_principal(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None, description="Bearer token, for clients that cannot send headers")
+) -> Principal:
+    """Like get_current_principal, but also accepts the token as ?access_token=.
+
+    Browsers' EventSource cannot set an Authorization header.
+    """
+    user_id = decode_token_cached(token or access_token or "")
+    if user_id is None:
+        raise _credentials_exception()
+    return Principal(id=user_id)
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: SessionRunner = Depends(get_db_runner)
+) -> User:
+    """Get the current authenticated user as an ORM object.
+
+    Costs a query unless the short-lived user cache is enabled, in which case
+    the returned User may be a detached, read-only snapshot.
+    """
+    user = user_cache.get(principal.id)
+    if user is not None:
+        return user
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # Off the event loop: threadpool for the sync engine, async driver otherwise
+    user = await db.run(_load_user, principal.id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     return user
+
+
+def forget_user(user_id: int):
+    """Drop a cached user, e.g. after it is changed or deleted."""
+    user_cache.pop(user_id)
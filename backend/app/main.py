@@ -1,57 +1,40 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.config import settings
+from app.services.data_version import AccountUnavailableError
+from app.services.hashing import HashingBusyError, password_hasher
+from app.services.metrics import MetricsMiddleware, metrics_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Apply pending migrations and add the routers before serving.
+    
+    Importing the app touches no database and imports no routers.
+    """
+    if settings.auto_migrate:
+        from app.database import engine
+        from app.migrations import migrate
+
+        for description in await run_in_threadpool(migrate, engine):
+            print(f"✅ Migration applied: {description}")
+
+    include_routers(app)
+    from app.services.account_deletion import account_purger
+
+    account_purger.start()
+    # Carry on with account purges interrupted by a restart
+    for job_id in await run_in_threadpool(account_purger.resume_stale):
+        print(f"✅ Resumed account deletion {job_id}")
+    yield
+    password_hasher.shutdown()
+    account_purger.shutdown()
 
-from app.database import engine, Base, SessionLocal
-from app.routers import auth, transactions, dashboard, categories
-from app.models.category import Category
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-
-def seed_categories():
-    """Seed initial categories if database is empty."""
-    db = SessionLocal()
-    try:
-        # Check if categories exist
-        existing = db.query(Category).first()
-        if existing:
-            return  # Already seeded
-        
-        # Seed default categories
-        default_categories = [
-            {"name": "Food & Dining", "type": "expense", "icon": "🍔", "color": "#EF4444"},
-            {"name": "Transportation", "type": "expense", "icon": "🚗", "color": "#F59E0B"},
-            {"name": "Shopping", "type": "expense", "icon": "🛍️", "color": "#EC4899"},
-            {"name": "Entertainment", "type": "expense", "icon": "🎬", "color": "#8B5CF6"},
-            {"name": "Bills & Utilities", "type": "expense", "icon": "💡", "color": "#6366F1"},
-            {"name": "Healthcare", "type": "expense", "icon": "🏥", "color": "#14B8A6"},
-            {"name": "Education", "type": "expense", "icon": "📚", "color": "#0EA5E9"},
-            {"name": "Travel", "type": "expense", "icon": "✈️", "color": "#F97316"},
-            {"name": "Groceries", "type": "expense", "icon": "🛒", "color": "#22C55E"},
-            {"name": "Other Expense", "type": "expense", "icon": "📦", "color": "#6B7280"},
-            {"name": "Salary", "type": "income", "icon": "💼", "color": "#10B981"},
-            {"name": "Freelance", "type": "income", "icon": "💻", "color": "#06B6D4"},
-            {"name": "Investments", "type": "income", "icon": "📈", "color": "#8B5CF6"},
-            {"name": "Gifts", "type": "income", "icon": "🎁", "color": "#F43F5E"},
-            {"name": "Other Income", "type": "income", "icon": "💰", "color": "#84CC16"},
-        ]
-        
-        for cat_data in default_categories:
-            category = Category(**cat_data)
-            db.add(category)
-        
-        db.commit()
-        print("✅ Categories seeded successfully!")
-    except Exception as e:
-        print(f"Error seeding categories: {e}")
-        db.rollback()
-    finally:
-        db.close()
-
-
-# Seed categories on startup
-seed_categories()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -59,7 +42,8 @@ app = FastAPI(
     description="Personal expense tracker API with data visualization",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -78,22 +62,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(auth.router)
-app.include_router(transactions.router)
-app.include_router(dashboard.router)
-app.include_router(categories.router)
+# Per-request timing and SQL counts (Server-Timing header, /api/metrics)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(AccountUnavailableError)
+async def account_unavailable_handler(request: Request, exc: AccountUnavailableError):
+    """A write with a still-valid token for an account that was deleted or is being purged."""
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"detail": "Could not validate credentials"},
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+@app.exception_handler(HashingBusyError)
+async def hashing_busy_handler(request: Request, exc: HashingBusyError):
+    """Shed login/register load instead of queueing unbounded hashing work."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+def include_routers(app: FastAPI):
+    """Import the routers (and through them the models and services) and add them, once.
+    
+    Runs in the lifespan startup; servers that preload the app (gunicorn.conf.py)
+    or drive it without a lifespan (the benchmarks) call it up front.
+    """
+    if getattr(app.state, "routers_included", False):
+        return
+    from app.routers import auth, categories, dashboard, transactions
+
+    app.include_router(auth.router)
+    app.include_router(transactions.router)
+    app.include_router(dashboard.router)
+    app.include_router(categories.router)
+    app.state.routers_included = True
+
 
 
 @app.get("/api/health")
 def health_check():
     """Health check endpoint."""
+    from app.services.analytics import analytics_cache
+
     return {
         "status": "ok",
-        "message": "SmartFinance API is running"
+        "message": "SmartFinance API is running",
+        "password_hashing": password_hasher.stats(),
+        "analytics_cache": analytics_cache.stats()
     }
 
 
+@app.get("/api/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Request and SQL metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def root():
     """Root endpoint with API info."""
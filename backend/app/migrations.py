@@ -0,0 +1,251 @@
+"""
+Schema setup and seed data, applied once per database instead of on import.
+
+Each step runs at most once per database: a one-row ``schema_version`` table
+records how many steps have been applied. ``migrate()`` takes a database-level
+lock (``BEGIN IMMEDIATE`` on SQLite, an advisory lock on PostgreSQL) before
+applying anything, so several workers starting together apply the pending
+steps exactly once and the rest wait, then find nothing to do.
+
+Steps must be idempotent (``checkfirst``, ``IF NOT EXISTS``): a fresh
+database gets every current table from the first step and still runs the
+later ones. Append new steps at the end; never reorder or remove one.
+
+On SQLite, foreign keys are off while steps run (the pragma cannot change
+inside a transaction), so a step that rebuilds a table can drop the old copy
+without ON DELETE CASCADE emptying the tables that reference it.
+"""
+import time
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.config import settings
+from app.database import Base, ids_never_reused
+from app.models.account_deletion import AccountDeletion
+from app.models.archive import TransactionArchive, archive_table
+from app.models.category import Category
+from app.models.rollup import MonthlyRollup  # noqa: F401  Import to register the model
+from app.models.tombstone import TransactionTombstone
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.rollup import rebuild_rollups, rollups_missing
+from app.services.search import search_index
+
+DEFAULT_CATEGORIES = [
+    # Expense categories
+    {"name": "Food & Dining", "type": "expense", "icon": "🍔", "color": "#EF4444"},
+    {"name": "Transportation", "type": "expense", "icon": "🚗", "color": "#F59E0B"},
+    {"name": "Shopping", "type": "expense", "icon": "🛍️", "color": "#EC4899"},
+    {"name": "Entertainment", "type": "expense", "icon": "🎬", "color": "#8B5CF6"},
+    {"name": "Bills & Utilities", "type": "expense", "icon": "💡", "color": "#6366F1"},
+    {"name": "Healthcare", "type": "expense", "icon": "🏥", "color": "#14B8A6"},
+    {"name": "Education", "type": "expense", "icon": "📚", "color": "#0EA5E9"},
+    {"name": "Travel", "type": "expense", "icon": "✈️", "color": "#F97316"},
+    {"name": "Groceries", "type": "expense", "icon": "🛒", "color": "#22C55E"},
+    {"name": "Other Expense", "type": "expense", "icon": "📦", "color": "#6B7280"},
+
+    # Income categories
+    {"name": "Salary", "type": "income", "icon": "💼", "color": "#10B981"},
+    {"name": "Freelance", "type": "income", "icon": "💻", "color": "#06B6D4"},
+    {"name": "Investments", "type": "income", "icon": "📈", "color": "#8B5CF6"},
+    {"name": "Gifts", "type": "income", "icon": "🎁", "color": "#F43F5E"},
+    {"name": "Other Income", "type": "income", "icon": "💰", "color": "#84CC16"},
+]
+
+# Kept out of Base.metadata: it is read before the first step creates anything
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, nullable=False),
+)
+
+# Arbitrary constant identifying this app's migration lock on PostgreSQL
+_PG_LOCK_KEY = 0x5346_0001
+
+
+def _create_indexes(conn: Connection):
+    """Add model indexes missing from existing tables, once their columns exist."""
+    present = {column["name"] for column in inspect(conn).get_columns("transactions")}
+    for index in Transaction.__table__.indexes:
+        if {column.name for column in index.columns} <= present:
+            index.create(bind=conn, checkfirst=True)
+
+
+def _create_tables(conn: Connection):
+    Base.metadata.create_all(bind=conn)
+    # create_all skips indexes on tables that already exist
+    _create_indexes(conn)
+
+
+def _add_user_data_version(conn: Connection):
+    if "data_version" not in {column["name"] for column in inspect(conn).get_columns("users")}:
+        conn.execute(text("ALTER TABLE users ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0"))
+
+
+def _add_transaction_sync(conn: Connection):
+    """Row versions and delete tombstones for /api/transactions/changes."""
+    if "version" not in {column["name"] for column in inspect(conn).get_columns("transactions")}:
+        conn.execute(text("ALTER TABLE transactions ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+    _create_indexes(conn)
+    TransactionTombstone.__table__.create(bind=conn, checkfirst=True)
+
+
+def _add_account_deletion(conn: Connection):
+    """users.deleted_at and the job table for background account purges."""
+    if "deleted_at" not in {column["name"] for column in inspect(conn).get_columns("users")}:
+        conn.execute(text("ALTER TABLE users ADD COLUMN deleted_at TIMESTAMP"))
+    AccountDeletion.__table__.create(bind=conn, checkfirst=True)
+
+
+def _add_transaction_archives(conn: Connection):
+    """Registry of per-year archive tables; the tables themselves are created by archive.py."""
+    TransactionArchive.__table__.create(bind=conn, checkfirst=True)
+
+
+def _rebuild_with_autoincrement(conn: Connection, table: Table, highest_known_id: int):
+    """Recreate a SQLite table from its model, copying every row, so its ids are never reused.
+
+    Without AUTOINCREMENT SQLite hands out max(id) + 1, which repeats the id
+    of a deleted newest row. The new sequence starts after highest_known_id.
+    """
+    name = table.name
+    rebuilt = f"_{name}_rebuild"
+    present = {column["name"] for column in inspect(conn).get_columns(name)}
+    columns = ", ".join(column.name for column in table.columns if column.name in present)
+    conn.execute(text(str(CreateTable(table).compile(conn)).replace(f"TABLE {name} (", f"TABLE {rebuilt} (", 1)))
+    conn.execute(text(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {name}"))
+    # Also drops the old indexes and triggers
+    conn.execute(text(f"DROP TABLE {name}"))
+    conn.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {name}"))
+    for index in table.indexes:
+        index.create(bind=conn, checkfirst=True)
+    conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": name})
+    conn.execute(
+        text(f"INSERT INTO sqlite_sequence (name, seq) SELECT :name, max(coalesce(max(id), 0), :floor) FROM {name}"),
+        {"name": name, "floor": highest_known_id},
+    )
+
+
+def _autoincrement_ids(conn: Connection):
+    """Rebuild users and transactions created before they used AUTOINCREMENT.
+
+    Tokens name users by id, and archived transactions keep theirs, so neither
+    id may be handed out again. Ids of users deleted before this step are only
+    known if a purge job recorded them.
+    """
+    if not ids_never_reused(conn, User.__tablename__):
+        purged = conn.execute(select(func.max(AccountDeletion.user_id))).scalar()
+        _rebuild_with_autoincrement(conn, User.__table__, purged or 0)
+    if not ids_never_reused(conn, Transaction.__tablename__):
+        known = [conn.execute(select(func.max(TransactionTombstone.transaction_id))).scalar()]
+        for (year,) in conn.execute(select(TransactionArchive.year)):
+            archive = archive_table(year)
+            if inspect(conn).has_table(archive.name):
+                known.append(conn.execute(select(func.max(archive.c.id))).scalar())
+        _rebuild_with_autoincrement(conn, Transaction.__table__, max(filter(None, known), default=0))
+        # The search triggers went with the old table; the index itself is keyed by the kept ids
+        search_index.install(conn)
+
+
+def _install_search_index(conn: Connection):
+    # SQLite FTS5; other databases fall back to ILIKE
+    search_index.install(conn)
+
+
+def _scope_search_index(conn: Connection):
+    """Reindex search with user_id, so matches are counted and ranked per user."""
+    search_index.reinstall(conn)
+
+
+def _seed_categories(conn: Connection):
+    if conn.execute(select(Category.id).limit(1)).first() is None:
+        conn.execute(Category.__table__.insert(), DEFAULT_CATEGORIES)
+
+
+def _backfill_rollups(conn: Connection):
+    """Build monthly rollups once for databases that predate them."""
+    db = Session(bind=conn)
+    try:
+        if rollups_missing(db):
+            rebuild_rollups(db)
+            db.flush()
+    finally:
+        db.close()
+
+
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("create tables and indexes", _create_tables),
+    ("add users.data_version", _add_user_data_version),
+    ("install full-text search index", _install_search_index),
+    ("seed default categories", _seed_categories),
+    ("backfill monthly rollups", _backfill_rollups),
+    ("add transaction versions and tombstones", _add_transaction_sync),
+    ("add account deletion jobs", _add_account_deletion),
+    ("add transaction archive registry", _add_transaction_archives),
+    ("never reuse user and transaction ids", _autoincrement_ids),
+    ("index search terms per user", _scope_search_index),
+]
+
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def current_version(conn: Connection) -> int:
+    """Number of steps applied to this database; 0 before the first migrate()."""
+    if not inspect(conn).has_table(schema_version.name):
+        return 0
+    return conn.execute(select(schema_version.c.version)).scalar() or 0
+
+
+def _lock(conn: Connection):
+    """Begin a transaction holding the database-wide migration lock."""
+    if conn.dialect.name == "sqlite":
+        # busy_timeout bounds each attempt; keep retrying up to the overall timeout
+        deadline = time.monotonic() + settings.migrate_lock_timeout_seconds
+        while True:
+            try:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                return
+            except OperationalError as exc:
+                conn.rollback()
+                if "locked" not in str(exc).lower() or time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.1)
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+
+
+def migrate(engine: Engine) -> List[str]:
+    """Apply pending steps under the migration lock; returns their descriptions."""
+    with engine.connect() as conn:
+        if current_version(conn) >= LATEST_VERSION:
+            return []
+        conn.rollback()
+
+        sqlite = conn.dialect.name == "sqlite"
+        if sqlite:
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            _lock(conn)
+            schema_version.create(conn, checkfirst=True)
+            version = current_version(conn)
+            applied = []
+            for description, step in MIGRATIONS[version:]:
+                step(conn)
+                applied.append(description)
+            if applied:
+                if version:
+                    conn.execute(schema_version.update().values(version=LATEST_VERSION))
+                else:
+                    conn.execute(schema_version.insert().values(version=LATEST_VERSION))
+            conn.commit()
+            return applied
+        finally:
+            if sqlite:
+                # The connection goes back to the pool
+                conn.rollback()
+                conn.exec_driver_sql("PRAGMA foreign_keys=ON")
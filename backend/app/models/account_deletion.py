@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class AccountDeletion(Base):
+    """Progress of a background account purge; outlives the user row it deletes."""
+    __tablename__ = "account_deletions"
+
+    id = Column(Integer, primary_key=True)
+    # No foreign key: the row must survive deleting the user
+    user_id = Column(Integer, nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    total = Column(Integer, nullable=True)  # Transactions to delete; counted when the purge starts
+    deleted = Column(Integer, nullable=False, default=0)
+    error = Column(String(255), nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    # Refreshed after every chunk; a stale value means the purging process went away
+    updated_at = Column(TIMESTAMP, nullable=False)
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+    def __repr__(self):
+        return f"<AccountDeletion(id={self.id}, user_id={self.user_id}, status='{self.status}')>"
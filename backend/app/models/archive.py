@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, MetaData, Numeric, String, Table, TIMESTAMP
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.category import Category
+from app.models.user import User
+
+ARCHIVE_TABLE_PREFIX = "transactions_archive_"
+
+# Archive tables are created on demand, one per year, so they stay out of
+# Base.metadata and are never touched by create_all
+archive_metadata = MetaData()
+
+
+class TransactionArchive(Base):
+    """A year of transactions moved out of the hot table (see services/archive.py)."""
+    __tablename__ = "transaction_archives"
+
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+    def __repr__(self):
+        return f"<TransactionArchive(year={self.year}, row_count={self.row_count})>"
+
+
+def archive_table(year: int) -> Table:
+    """The archive table for one year: transactions' columns, and only the read indexes.
+
+    Rows keep their id and version. Nothing writes to an archive except the
+    archiver, so the extra (user_id, version) index costs nothing on the hot path.
+    """
+    name = f"{ARCHIVE_TABLE_PREFIX}{year}"
+    table = archive_metadata.tables.get(name)
+    if table is None:
+        table = Table(
+            name,
+            archive_metadata,
+            Column("id", Integer, primary_key=True, autoincrement=False),
+            Column("amount", Numeric(12, 2), nullable=False),
+            Column("date", Date, nullable=False),
+            Column("description", String(255), nullable=True),
+            Column("user_id", Integer, ForeignKey(User.__table__.c.id, ondelete="CASCADE"), nullable=False),
+            Column("category_id", Integer, ForeignKey(Category.__table__.c.id), nullable=False),
+            Column("created_at", TIMESTAMP),
+            Column("version", Integer, nullable=False, default=0),
+            Index(f"ix_{name}_user_date_id", "user_id", "date", "id"),
+            Index(f"ix_{name}_user_version", "user_id", "version"),
+        )
+    return table
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey
+from app.database import Base
+
+
+class MonthlyRollup(Base):
+    """Per-user, per-month, per-category totals kept in step with transactions."""
+    __tablename__ = "monthly_rollups"
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    year_month = Column(String(7), primary_key=True)  # 'YYYY-MM'
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyRollup(user_id={self.user_id}, year_month='{self.year_month}', category_id={self.category_id})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.database import Base
+
+
+class TransactionTombstone(Base):
+    """Marks a deleted transaction so delta sync can tell clients to drop it."""
+    __tablename__ = "transaction_tombstones"
+    __table_args__ = (
+        # Serves /api/transactions/changes: WHERE user_id = ? AND version > ?
+        Index("ix_transaction_tombstones_user_version", "user_id", "version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    transaction_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<TransactionTombstone(transaction_id={self.transaction_id}, version={self.version})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, Date, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Numeric, Date, ForeignKey, TIMESTAMP, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -7,6 +7,14 @@ from app.database import Base
 class Transaction(Base):
     """Transaction model for income and expenses."""
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Serves the keyset-paginated list: WHERE user_id = ? ORDER BY date, id
+        Index("ix_transactions_user_date_id", "user_id", "date", "id"),
+        # Serves delta sync: WHERE user_id = ? AND version > ?
+        Index("ix_transactions_user_version", "user_id", "version"),
+        # Ids must stay unique across the hot table and the archives (services/archive.py)
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Numeric(12, 2), nullable=False)
@@ -25,6 +33,8 @@ class Transaction(Base):
         index=True
     )
     created_at = Column(TIMESTAMP, server_default=func.now())
+    # The owner's data_version when this row was last written (see services/data_version.py)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     user = relationship("User", back_populates="transactions")
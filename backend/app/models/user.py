@@ -7,15 +7,22 @@ from app.database import Base
 class User(Base):
     """User model for authentication."""
     __tablename__ = "users"
+    # Never hand a deleted account's id to a new user: tokens name users by id
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, nullable=False, index=True)
     email = Column(String(100), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    # Bumped in the same database transaction as every write to the user's transactions
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set when a background purge of the account starts; the user can no longer sign in
+    deleted_at = Column(TIMESTAMP, nullable=True)
 
-    # Relationship with transactions
-    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
+    # Relationship with transactions; passive_deletes leaves removing them to
+    # ON DELETE CASCADE instead of loading and deleting each row in Python
+    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}')>"
@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import Optional
 
-from app.database import get_db
+from app.database import SessionRunner, get_db_runner
+from app.models.account_deletion import AccountDeletion
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse, Token
-from app.services.auth import get_password_hash, verify_password, create_access_token
-from app.dependencies import get_current_user
+from app.schemas.user import AccountDeletionResponse, Principal, UserCreate, UserResponse, Token
+from app.services.account_deletion import account_purger, request_deletion
+from app.services.auth import create_access_token
+from app.services.hashing import password_hasher
+from app.dependencies import forget_user, get_current_principal, get_current_user
 from app.config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
-@router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user."""
+def _ensure_available(db: Session, user_data: UserCreate):
+    """Reject registrations that reuse an email or username."""
     # Check if email exists
     if db.query(User).filter(User.email == user_data.email).first():
         raise HTTPException(
@@ -29,34 +33,62 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
-    
-    # Create user
+
+
+def _create_user(db: Session, user_data: UserCreate, password_hash: str) -> int:
     user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password)
+        password_hash=password_hash
     )
     
     db.add(user)
+    try:
+        db.flush()
+    except IntegrityError:
+        # A concurrent registration took the email or username while we hashed
+        db.rollback()
+        _ensure_available(db, user_data)
+        raise
+    user_id = user.id
     db.commit()
-    db.refresh(user)
-    
-    # Create access token
+    return user_id
+
+
+def _find_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email, User.deleted_at.is_(None)).first()
+
+
+def _issue_token(user_id: int) -> Token:
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data={"sub": str(user_id)},
         expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
     )
-    
     return Token(access_token=access_token)
 
 
+@router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
+async def register(user_data: UserCreate, db: SessionRunner = Depends(get_db_runner)):
+    """Register a new user."""
+    await db.run(_ensure_available, user_data)
+    
+    # Hash on the dedicated hashing executor, not the request threadpool
+    password_hash = await password_hasher.hash(user_data.password)
+    
+    # Create user
+    user_id = await db.run(_create_user, user_data, password_hash)
+    
+    # Create access token
+    return _issue_token(user_id)
+
+
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: SessionRunner = Depends(get_db_runner)):
     """Login and get access token."""
     # Find user by email (username field in OAuth2 form)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.run(_find_user_by_email, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await password_hasher.verify(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -64,15 +96,64 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         )
     
     # Create access token
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
-        expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
-    )
-    
-    return Token(access_token=access_token)
+    return _issue_token(user.id)
 
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information."""
     return current_user
+
+
+def _delete_account(db: Session, user_id: int) -> Optional[AccountDeletionResponse]:
+    job = request_deletion(db, user_id)
+    response = None if job is None else AccountDeletionResponse.model_validate(job)
+    db.commit()
+    return response
+
+
+def _get_deletion(db: Session, job_id: int, user_id: int) -> AccountDeletionResponse:
+    job = db.get(AccountDeletion, job_id)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Account deletion not found")
+    return AccountDeletionResponse.model_validate(job)
+
+
+@router.delete(
+    "/me",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={202: {"model": AccountDeletionResponse, "description": "Large account; purge scheduled"}}
+)
+async def delete_account(
+    current_user: User = Depends(get_current_user),
+    db: SessionRunner = Depends(get_db_runner)
+):
+    """Delete the current user and all their data.
+
+    Returns 204 once done, or 202 with a job to poll at /api/auth/deletions/{id}
+    when the account is large enough to be purged in the background.
+    """
+    user_id = current_user.id
+    job = await db.run(_delete_account, user_id)
+    forget_user(user_id)
+    if job is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    if job.status == "pending":
+        account_purger.submit(job.id)
+    return Response(
+        content=job.model_dump_json(),
+        status_code=status.HTTP_202_ACCEPTED,
+        media_type="application/json",
+        headers={"Location": f"/api/auth/deletions/{job.id}"}
+    )
+
+
+@router.get("/deletions/{job_id}", response_model=AccountDeletionResponse)
+async def get_account_deletion(
+    job_id: int,
+    principal: Principal = Depends(get_current_principal),
+    db: SessionRunner = Depends(get_db_runner)
+):
+    """Progress of a background account deletion; the token keeps working until it expires."""
+    return await db.run(_get_deletion, job_id, principal.id)
@@ -1,30 +1,39 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request, Response, status
 from typing import List
 
-from app.database import get_db
-from app.models.category import Category
+from app.database import SessionRunner, get_db_runner
 from app.schemas.category import CategoryResponse
+from app.services.category_catalog import category_catalog
+from app.services.etag import etag_matches
 
 router = APIRouter(prefix="/api/categories", tags=["Categories"])
 
 
+def _catalog_response(request: Request, response: Response, etag: str, categories: List[CategoryResponse]):
+    """Answer from the catalog, or with 304 when the client already has this version."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return categories
+
+
 @router.get("/", response_model=List[CategoryResponse])
-def get_categories(db: Session = Depends(get_db)):
+async def get_categories(request: Request, response: Response, db: SessionRunner = Depends(get_db_runner)):
     """Get all categories."""
-    categories = db.query(Category).all()
-    return categories
+    snapshot = await db.run(category_catalog.snapshot)
+    return _catalog_response(request, response, snapshot.etag, snapshot.all)
 
 
 @router.get("/income", response_model=List[CategoryResponse])
-def get_income_categories(db: Session = Depends(get_db)):
+async def get_income_categories(request: Request, response: Response, db: SessionRunner = Depends(get_db_runner)):
     """Get income categories only."""
-    categories = db.query(Category).filter(Category.type == "income").all()
-    return categories
+    snapshot = await db.run(category_catalog.snapshot)
+    return _catalog_response(request, response, snapshot.etag, snapshot.by_type.get("income", []))
 
 
 @router.get("/expense", response_model=List[CategoryResponse])
-def get_expense_categories(db: Session = Depends(get_db)):
+async def get_expense_categories(request: Request, response: Response, db: SessionRunner = Depends(get_db_runner)):
     """Get expense categories only."""
-    categories = db.query(Category).filter(Category.type == "expense").all()
-    return categories
+    snapshot = await db.run(category_catalog.snapshot)
+    return _catalog_response(request, response, snapshot.etag, snapshot.by_type.get("expense", []))
@@ -1,105 +1,227 @@
-from fastapi import APIRouter, Depends
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from decimal import Decimal
-from typing import List
+from typing import List, Literal, Optional, Tuple
+from datetime import date
 
-from app.database import get_db
-from app.models.user import User
-from app.models.category import Category
-from app.models.transaction import Transaction
-from app.schemas.dashboard import DashboardSummary, ChartDataItem
-from app.dependencies import get_current_user
+from app.config import settings
+from app.database import SessionRunner, get_read_db_runner, read_db_runner
+from app.schemas.user import Principal
+from app.schemas.dashboard import DashboardSummary, DashboardOverview, ChartDataItem, TimeSeriesPoint
+from app.dependencies import get_current_principal, get_stream_principal
+from app.services.category_catalog import category_catalog
+from app.services.dashboard import TimeSeriesTooLong, build_overview, build_timeseries
+from app.services.dashboard_events import RESYNC, dashboard_events
+from app.services.data_version import get_data_version
+from app.services.etag import etag_matches, make_etag
+from app.services.response_cache import dashboard_cache
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
+_overview_adapter = TypeAdapter(DashboardOverview)
+_summary_adapter = TypeAdapter(DashboardSummary)
+_chart_adapter = TypeAdapter(List[ChartDataItem])
+_timeseries_adapter = TypeAdapter(List[TimeSeriesPoint])
+
+
+def _cache_state(db: Session, user_id: int) -> Tuple[int, str]:
+    """Everything a cached dashboard response depends on besides the request itself."""
+    return get_data_version(db, user_id), category_catalog.snapshot(db).etag
+
+
+async def _cached_response(
+    request: Request,
+    db: SessionRunner,
+    user_id: int,
+    name: str,
+    params: tuple,
+    adapter: TypeAdapter,
+    build,
+    *args
+) -> Response:
+    """Serve a dashboard response from the cache, computing it on a miss.
+    
+    The ETag is derived from the cache key, so a matching If-None-Match is
+    answered with 304 after a single version lookup.
+    """
+    version, catalog_etag = await db.run(_cache_state, user_id)
+    key = f"dashboard:{user_id}:{version}:{catalog_etag}:{name}:{params!r}"
+    etag = make_etag(key.encode())
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    body = await dashboard_cache.get(key)
+    if body is None:
+        body = adapter.dump_json(await db.run(build, *args))
+        await dashboard_cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _overview(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    """The overview stamped with the data version it reflects.
+    
+    Reads are not one snapshot, so a write committing mid-build is detected by
+    the version moving and the overview is rebuilt.
+    """
+    version = get_data_version(db, user_id)
+    for _ in range(3):
+        overview = build_overview(db, user_id, start_date, end_date)
+        current = get_data_version(db, user_id)
+        if current == version:
+            break
+        version = current
+    overview.data_version = version
+    return overview
+
+
+def _summary(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    return build_overview(db, user_id, start_date, end_date).summary
+
+
+def _expense_chart(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    return build_overview(db, user_id, start_date, end_date).expense_chart
+
+
+def _income_chart(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    return build_overview(db, user_id, start_date, end_date).income_chart
+
+
+async def date_range(
+    start_date: Optional[date] = Query(None, description="Include transactions on or after this date"),
+    end_date: Optional[date] = Query(None, description="Include transactions on or before this date")
+) -> Tuple[Optional[date], Optional[date]]:
+    """Shared start_date/end_date query parameters for dashboard endpoints."""
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    return start_date, end_date
+
+
+@router.get("/overview", response_model=DashboardOverview)
+async def get_overview(
+    request: Request,
+    dates: Tuple[Optional[date], Optional[date]] = Depends(date_range),
+    db: SessionRunner = Depends(get_read_db_runner),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Get summary, expense chart and income chart in one aggregation pass.
+    
+    data_version is the version the numbers reflect; /stream events at or
+    below it are already counted.
+    """
+    return await _cached_response(
+        request, db, principal.id, "overview", dates, _overview_adapter, _overview, principal.id, *dates
+    )
+
 
 @router.get("/summary", response_model=DashboardSummary)
-def get_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_summary(
+    request: Request,
+    dates: Tuple[Optional[date], Optional[date]] = Depends(date_range),
+    db: SessionRunner = Depends(get_read_db_runner),
+    principal: Principal = Depends(get_current_principal)
 ):
     """Get total income, expenses, and balance for the current user."""
-    # Calculate total income
-    income_result = db.query(func.coalesce(func.sum(Transaction.amount), 0)).join(
-        Category
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Category.type == "income"
-    ).scalar()
-
-    # Calculate total expenses
-    expenses_result = db.query(func.coalesce(func.sum(Transaction.amount), 0)).join(
-        Category
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Category.type == "expense"
-    ).scalar()
-
-    total_income = Decimal(str(income_result))
-    total_expenses = Decimal(str(expenses_result))
-    balance = total_income - total_expenses
-
-    return DashboardSummary(
-        total_income=total_income,
-        total_expenses=total_expenses,
-        balance=balance
+    return await _cached_response(
+        request, db, principal.id, "summary", dates, _summary_adapter, _summary, principal.id, *dates
     )
 
 
 @router.get("/chart", response_model=List[ChartDataItem])
-def get_expense_chart(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_expense_chart(
+    request: Request,
+    dates: Tuple[Optional[date], Optional[date]] = Depends(date_range),
+    db: SessionRunner = Depends(get_read_db_runner),
+    principal: Principal = Depends(get_current_principal)
 ):
     """Get expenses grouped by category for pie chart visualization."""
-    results = db.query(
-        Category.name,
-        Category.color,
-        func.sum(Transaction.amount).label("total")
-    ).join(
-        Transaction
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Category.type == "expense"
-    ).group_by(
-        Category.id, Category.name, Category.color
-    ).all()
-
-    return [
-        ChartDataItem(
-            category=row.name,
-            amount=Decimal(str(row.total)) if row.total else Decimal(0),
-            color=row.color or "#6B7280"
-        )
-        for row in results
-    ]
+    return await _cached_response(
+        request, db, principal.id, "chart", dates, _chart_adapter, _expense_chart, principal.id, *dates
+    )
 
 
 @router.get("/income-chart", response_model=List[ChartDataItem])
-def get_income_chart(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_income_chart(
+    request: Request,
+    dates: Tuple[Optional[date], Optional[date]] = Depends(date_range),
+    db: SessionRunner = Depends(get_read_db_runner),
+    principal: Principal = Depends(get_current_principal)
 ):
     """Get income grouped by category for pie chart visualization."""
-    results = db.query(
-        Category.name,
-        Category.color,
-        func.sum(Transaction.amount).label("total")
-    ).join(
-        Transaction
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Category.type == "income"
-    ).group_by(
-        Category.id, Category.name, Category.color
-    ).all()
-
-    return [
-        ChartDataItem(
-            category=row.name,
-            amount=Decimal(str(row.total)) if row.total else Decimal(0),
-            color=row.color or "#10B981"
+    return await _cached_response(
+        request, db, principal.id, "income-chart", dates, _chart_adapter, _income_chart, principal.id, *dates
+    )
+
+
+@router.get("/timeseries", response_model=List[TimeSeriesPoint])
+async def get_timeseries(
+    request: Request,
+    period: Literal["day", "week", "month"] = Query("month", description="Bucket size"),
+    dates: Tuple[Optional[date], Optional[date]] = Depends(date_range),
+    db: SessionRunner = Depends(get_read_db_runner),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Get income and expenses bucketed by day, week or month for trend charts."""
+    try:
+        return await _cached_response(
+            request, db, principal.id, "timeseries", (period, *dates), _timeseries_adapter, build_timeseries, principal.id, period, *dates
+        )
+    except TimeSeriesTooLong as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-        for row in results
-    ]
+
+
+def _sse(event: str, data: bytes, event_id: Optional[int] = None) -> bytes:
+    """One Server-Sent Events message; data must be a single line of JSON."""
+    head = f"event: {event}\n" + (f"id: {event_id}\n" if event_id is not None else "")
+    return head.encode() + b"data: " + data + b"\n\n"
+
+
+@router.get("/stream")
+async def stream_dashboard(
+    request: Request,
+    principal: Principal = Depends(get_stream_principal)
+):
+    """Push dashboard changes to the current user as Server-Sent Events.
+    
+    Starts with a `ready` event carrying the current data version, followed by
+    `resync` if Last-Event-ID shows the client missed writes while away. Each
+    write then sends a `dashboard` event with the new all-time totals and the
+    changed per-category monthly amounts; events at or below a version the
+    client already has can be ignored. `resync` means events were dropped and
+    the dashboard should be refetched. Pass the token as ?access_token= from
+    EventSource. An idle stream runs no queries, only a keep-alive comment.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    
+    async def events():
+        # Subscribe before reading the version, so no write can fall in between
+        async with dashboard_events.subscribe(principal.id) as subscription:
+            async with read_db_runner() as db:
+                version = await db.run(get_data_version, principal.id)
+            yield b"retry: 5000\n\n" + _sse("ready", json.dumps({"version": version}).encode(), version)
+            if last_event_id.isdigit() and int(last_event_id) < version:
+                yield _sse("resync", b"{}")
+            
+            while True:
+                message = await subscription.next(settings.dashboard_stream_heartbeat_seconds)
+                if message is None:
+                    yield b": keep-alive\n\n"
+                elif message == RESYNC:
+                    yield _sse("resync", b"{}")
+                else:
+                    yield _sse("dashboard", message, json.loads(message)["version"])
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,96 +1,704 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import and_, or_, select, union_all, update, delete
+from typing import Literal, Optional, Tuple
 from datetime import date
 
-from app.database import get_db
-from app.models.user import User
+from app.config import settings
+from app.database import SessionRunner, db_runner, get_db_runner, read_db_runner
 from app.models.category import Category
+from app.models.tombstone import TransactionTombstone
 from app.models.transaction import Transaction
+from app.services.archive import archived_years, partition_tables, routed_transactions, thaw
+from app.schemas.user import Principal
 from app.schemas.transaction import (
     TransactionCreate,
     TransactionUpdate,
     TransactionResponse,
-    TransactionListResponse
+    TransactionPage,
+    TransactionSearchPage,
+    TransactionChanges,
+    BulkImportResult,
+    TransactionBatchRequest,
+    TransactionBatchResult
 )
-from app.dependencies import get_current_user
+from app.dependencies import get_current_principal
+from app.services.category_catalog import category_catalog
+from app.services.dashboard_events import dashboard_events
+from app.services.data_version import bump_data_version, get_data_version
+from app.services.exporter import EXPORT_MEDIA_TYPES, stream_export
+from app.services.importer import ImportFormatError, ImportReport, insert_batch, iter_batches, validate_batch
+from app.services.pagination import encode_cursor, decode_cursor, encode_sync_token, decode_sync_token
+from app.services.rollup import RollupDeltas
+from app.services.search import apply_search, search_terms
+from app.services.serialization import encode_transaction_page
 
 router = APIRouter(prefix="/api/transactions", tags=["Transactions"])
 
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
 
-@router.get("/", response_model=List[TransactionListResponse])
-def get_transactions(
-    start_date: Optional[date] = Query(None, description="Filter start date"),
-    end_date: Optional[date] = Query(None, description="Filter end date"),
-    category_id: Optional[int] = Query(None, description="Filter by category"),
-    transaction_type: Optional[str] = Query(None, description="Filter by type (income/expense)"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+
+def _load_user_transaction(db: Session, source, user_id: int, transaction_id: int) -> Optional[Transaction]:
+    return db.query(source).options(
+        joinedload(source.category)
+    ).filter(
+        and_(
+            source.id == transaction_id,
+            source.user_id == user_id
+        )
+    ).first()
+
+
+def _get_user_transaction(
+    db: Session, user_id: int, transaction_id: int, for_write: bool = False
+) -> Optional[Transaction]:
+    """Load a transaction owned by the user, with its category in the same query.
+    
+    Rows missing from the hot table are looked up in the archives; with
+    for_write they are moved back to the hot table first, so callers can
+    change them like any other row.
+    """
+    transaction = _load_user_transaction(db, Transaction, user_id, transaction_id)
+    if transaction is not None or not archived_years(db):
+        return transaction
+    
+    if for_write:
+        if thaw(db, user_id, [transaction_id]):
+            return _load_user_transaction(db, Transaction, user_id, transaction_id)
+        return None
+    source = routed_transactions(db, lambda c: [c.id == transaction_id, c.user_id == user_id])
+    return _load_user_transaction(db, source, user_id, transaction_id)
+
+
+def _source(
+    db: Session,
+    user_id: int,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    category_id: Optional[int],
+    transaction_type: Optional[str],
+    position: Optional[Tuple[date, int]] = None,
+    limit: Optional[int] = None
 ):
-    """Get all transactions for the current user with optional filters."""
-    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+    """Transaction, or a union with the archives these filters reach (see services/archive.py).
+    
+    The same filters are pushed into every partition; with limit, each one
+    contributes at most one keyset page.
+    """
+    def where(c):
+        clauses = [c.user_id == user_id]
+        if start_date:
+            clauses.append(c.date >= start_date)
+        if end_date:
+            clauses.append(c.date <= end_date)
+        if category_id:
+            clauses.append(c.category_id == category_id)
+        if transaction_type:
+            clauses.append(c.category_id.in_(
+                [category.id for category in category_catalog.by_type(db, transaction_type)]
+            ))
+        if position:
+            clauses.append(_after_position(c, position))
+        return clauses
+    
+    # A page after a cursor holds nothing newer than the cursor's date
+    upper = end_date
+    if position and (upper is None or position[0] < upper):
+        upper = position[0]
+    return routed_transactions(db, where, start_date, upper, limit)
+
+
+def _filter_transactions(
+    query,
+    source,
+    user_id: int,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    category_id: Optional[int],
+    transaction_type: Optional[str]
+):
+    """Apply the list filters shared by listing and export; source is Transaction or a _source() union."""
+    query = query.filter(source.user_id == user_id)
     
     # Apply date filters
     if start_date:
-        query = query.filter(Transaction.date >= start_date)
+        query = query.filter(source.date >= start_date)
     if end_date:
-        query = query.filter(Transaction.date <= end_date)
+        query = query.filter(source.date <= end_date)
     if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+        query = query.filter(source.category_id == category_id)
     
     # Filter by transaction type (join with category)
     if transaction_type:
-        query = query.join(Category).filter(Category.type == transaction_type)
+        query = query.join(source.category).filter(Category.type == transaction_type)
     
-    transactions = query.order_by(Transaction.date.desc()).all()
-    return transactions
+    return query
 
 
-@router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
-def create_transaction(
-    transaction: TransactionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+def _after_position(source, position: Tuple[date, int]):
+    last_date, last_id = position
+    return or_(
+        source.date < last_date,
+        and_(source.date == last_date, source.id < last_id)
+    )
+
+
+def _keyset_page(query, source, position: Optional[Tuple[date, int]], limit: int):
+    """Order newest first and resume after the previous page's last (date, id)."""
+    if position:
+        query = query.filter(_after_position(source, position))
+    
+    # Fetch one extra row to know whether another page exists
+    return query.order_by(
+        source.date.desc(), source.id.desc()
+    ).limit(limit + 1)
+
+
+def _list_transactions(
+    db: Session,
+    user_id: int,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    category_id: Optional[int],
+    transaction_type: Optional[str],
+    limit: int,
+    position: Optional[Tuple[date, int]]
+) -> TransactionPage:
+    """Query one keyset page of a user's transactions, newest first."""
+    source = _source(db, user_id, start_date, end_date, category_id, transaction_type, position, limit + 1)
+    query = _filter_transactions(
+        db.query(source), source, user_id, start_date, end_date, category_id, transaction_type
+    )
+    
+    # Reuse the type filter's join to load categories, otherwise join them in
+    if transaction_type:
+        query = query.options(contains_eager(source.category))
+    else:
+        query = query.options(joinedload(source.category))
+    
+    transactions = _keyset_page(query, source, position, limit).all()
+    
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.date, last.id)
+    
+    return TransactionPage(items=transactions, next_cursor=next_cursor)
+
+
+def _list_transactions_fast(
+    db: Session,
+    user_id: int,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    category_id: Optional[int],
+    transaction_type: Optional[str],
+    limit: int,
+    position: Optional[Tuple[date, int]]
+) -> bytes:
+    """Same page as _list_transactions, fetched as tuples and encoded straight to JSON."""
+    categories = {
+        category.id: category.model_dump()
+        for category in category_catalog.snapshot(db).all
+    }
+    source = _source(db, user_id, start_date, end_date, category_id, transaction_type, position, limit + 1)
+    query = _filter_transactions(
+        db.query(
+            source.id,
+            source.amount,
+            source.date,
+            source.description,
+            source.category_id
+        ),
+        source, user_id, start_date, end_date, category_id, transaction_type
+    )
+    rows = _keyset_page(query, source, position, limit).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    
+    return encode_transaction_page(rows, categories, next_cursor)
+
+
+@router.get("/", response_model=TransactionPage)
+async def get_transactions(
+    start_date: Optional[date] = Query(None, description="Filter start date"),
+    end_date: Optional[date] = Query(None, description="Filter end date"),
+    category_id: Optional[int] = Query(None, description="Filter by category"),
+    transaction_type: Optional[str] = Query(None, description="Filter by type (income/expense)"),
+    limit: int = Query(
+        settings.transactions_page_size,
+        ge=1,
+        le=settings.transactions_max_page_size,
+        description="Maximum number of transactions to return"
+    ),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
 ):
-    """Create a new transaction."""
+    """Get a page of transactions for the current user with optional filters, newest first."""
+    position = None
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    
+    if settings.fast_serialization:
+        body = await db.run(
+            _list_transactions_fast,
+            principal.id,
+            start_date,
+            end_date,
+            category_id,
+            transaction_type,
+            limit,
+            position
+        )
+        return Response(content=body, media_type="application/json")
+    
+    return await db.run(
+        _list_transactions,
+        principal.id,
+        start_date,
+        end_date,
+        category_id,
+        transaction_type,
+        limit,
+        position
+    )
+
+
+def _search_transactions(
+    db: Session,
+    user_id: int,
+    terms,
+    start_date: Optional[date],
+    end_date: Optional[date],
+    category_id: Optional[int],
+    transaction_type: Optional[str],
+    limit: int,
+    offset: int
+) -> TransactionSearchPage:
+    """Query one page of a user's transactions matching the search terms, best first."""
+    source = _source(db, user_id, start_date, end_date, category_id, transaction_type)
+    query = _filter_transactions(
+        db.query(source), source, user_id, start_date, end_date, category_id, None
+    ).join(source.category).options(contains_eager(source.category))
+    if transaction_type:
+        query = query.filter(Category.type == transaction_type)
+    
+    # Fetch one extra row to know whether another page exists
+    transactions = apply_search(db, query, user_id, terms, source).offset(offset).limit(limit + 1).all()
+    
+    next_offset = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        next_offset = offset + limit
+    
+    return TransactionSearchPage(items=transactions, next_offset=next_offset)
+
+
+@router.get("/search", response_model=TransactionSearchPage)
+async def search_transactions(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in descriptions; each matches as a prefix"),
+    start_date: Optional[date] = Query(None, description="Filter start date"),
+    end_date: Optional[date] = Query(None, description="Filter end date"),
+    category_id: Optional[int] = Query(None, description="Filter by category"),
+    transaction_type: Optional[str] = Query(None, description="Filter by type (income/expense)"),
+    limit: int = Query(
+        settings.transactions_page_size,
+        ge=1,
+        le=settings.transactions_max_page_size,
+        description="Maximum number of transactions to return"
+    ),
+    offset: int = Query(0, ge=0, description="Results to skip, from a previous page's next_offset"),
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Search the current user's transaction descriptions, best matches first."""
+    terms = search_terms(q)
+    if not terms:
+        return TransactionSearchPage(items=[])
+    
+    return await db.run(
+        _search_transactions,
+        principal.id,
+        terms,
+        start_date,
+        end_date,
+        category_id,
+        transaction_type,
+        limit,
+        offset
+    )
+
+
+def _transaction_changes(db: Session, user_id: int, since: Optional[int], limit: int) -> TransactionChanges:
+    """Transactions written or deleted after the `since` data version, oldest change first.
+    
+    A page ends on a version boundary, so one write (a batch or an import
+    chunk) is never split across pages; a single version larger than
+    `limit` is returned whole.
+    """
+    current = get_data_version(db, user_id)
+    if since is None or since == current:
+        return TransactionChanges(items=[], deleted=[], next_since=encode_sync_token(current))
+    if since > current:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync checkpoint is not valid for this account; reload transactions and sync again"
+        )
+    
+    # Version of the first change that does not fit; stop just before it
+    # (archived rows keep their version, so old rows written lately still sync)
+    changed = union_all(
+        *(
+            select(table.c.version).where(table.c.user_id == user_id, table.c.version > since)
+            for table in partition_tables(db)
+        ),
+        select(TransactionTombstone.version).where(
+            TransactionTombstone.user_id == user_id, TransactionTombstone.version > since
+        )
+    ).subquery()
+    overflow = db.execute(
+        select(changed.c.version).order_by(changed.c.version).offset(limit).limit(1)
+    ).scalar()
+    upto = current
+    if overflow is not None:
+        upto = overflow - 1 if overflow - 1 > since else overflow
+    
+    def window(c):
+        return [c.user_id == user_id, c.version > since, c.version <= upto]
+    
+    source = routed_transactions(db, window)
+    items = db.query(source).options(joinedload(source.category)).filter(
+        *window(source)
+    ).order_by(source.version, source.id).all()
+    deleted = db.scalars(
+        select(TransactionTombstone.transaction_id).where(
+            TransactionTombstone.user_id == user_id,
+            TransactionTombstone.version > since,
+            TransactionTombstone.version <= upto
+        ).order_by(TransactionTombstone.version, TransactionTombstone.id)
+    ).all()
+    
+    return TransactionChanges(
+        items=items,
+        # An id can be deleted, reused by a new row and deleted again
+        deleted=list(dict.fromkeys(deleted)),
+        next_since=encode_sync_token(upto),
+        has_more=upto < current
+    )
+
+
+@router.get("/changes", response_model=TransactionChanges)
+async def get_transaction_changes(
+    since: Optional[str] = Query(
+        None, description="next_since from the previous call; omit to get a checkpoint before loading the list"
+    ),
+    limit: int = Query(
+        settings.transactions_max_page_size,
+        ge=1,
+        le=settings.transactions_max_page_size,
+        description="Changes per page (a single write is never split, so a page may exceed this)"
+    ),
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Get the transactions created, updated or deleted since a sync checkpoint.
+    
+    Take a checkpoint (no `since`) before loading the list, then pass each
+    response's next_since back. Apply `deleted` before `items`, and call
+    again while has_more is true. An up-to-date client costs one primary
+    key lookup and gets an empty response.
+    """
+    version = None
+    if since:
+        version = decode_sync_token(since)
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync checkpoint"
+            )
+    
+    return await db.run(_transaction_changes, principal.id, version, limit)
+
+
+@router.get("/export")
+async def export_transactions(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format", description="Export format"),
+    start_date: Optional[date] = Query(None, description="Filter start date"),
+    end_date: Optional[date] = Query(None, description="Filter end date"),
+    category_id: Optional[int] = Query(None, description="Filter by category"),
+    transaction_type: Optional[str] = Query(None, description="Filter by type (income/expense)"),
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Stream all matching transactions as CSV or NDJSON, newest first."""
+    catalog = await db.run(category_catalog.snapshot)
+    
+    def build_query(session: Session):
+        source = _source(session, principal.id, start_date, end_date, category_id, transaction_type)
+        return _filter_transactions(
+            session.query(source), source, principal.id, start_date, end_date, category_id, transaction_type
+        ).order_by(source.date.desc(), source.id.desc())
+    
+    return StreamingResponse(
+        stream_export(build_query, catalog, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{export_format}"'}
+    )
+
+
+def _create_transaction(
+    db: Session, user_id: int, transaction: TransactionCreate
+) -> Tuple[Transaction, Optional[bytes]]:
+    """Insert a transaction; returns it with its category and the dashboard event to publish."""
     # Verify category exists
-    category = db.query(Category).filter(Category.id == transaction.category_id).first()
-    if not category:
+    if category_catalog.get(db, transaction.category_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
     
     # Create transaction
+    version = bump_data_version(db, user_id)
     db_transaction = Transaction(
         amount=transaction.amount,
         date=transaction.date,
         description=transaction.description,
         category_id=transaction.category_id,
-        user_id=current_user.id
+        user_id=user_id,
+        version=version
     )
     
     db.add(db_transaction)
+    
+    # Keep monthly rollups in the same database transaction
+    deltas = RollupDeltas()
+    deltas.add(user_id, transaction.date, transaction.category_id, transaction.amount)
+    event = dashboard_events.prepare(db, user_id, version, deltas.apply(db))
+    
+    db.flush()
+    # Read the id before commit expires the instance
+    transaction_id = db_transaction.id
+    db.commit()
+    
+    return _get_user_transaction(db, user_id, transaction_id), event
+
+
+@router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
+async def create_transaction(
+    transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Create a new transaction."""
+    created, event = await db.run(_create_transaction, principal.id, transaction)
+    background_tasks.add_task(dashboard_events.publish, principal.id, event)
+    return created
+
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import_transactions(
+    request: Request,
+    input_format: Optional[Literal["csv", "ndjson"]] = Query(
+        None, alias="format", description="Input format; defaults to the request Content-Type"
+    ),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Import transactions from a streamed CSV or NDJSON body.
+    
+    Rows are validated and inserted in batches, each committed on its own,
+    and every rejected row is reported back with its row number. A session
+    is only held while a batch is written, not while the upload is read.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = input_format or IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson"
+        )
+    
+    async with read_db_runner() as db:
+        snapshot = await db.run(category_catalog.snapshot)
+    category_ids = set(snapshot.by_id)
+    report = ImportReport(settings.import_max_errors)
+    
+    try:
+        async for batch in iter_batches(request.stream(), fmt, settings.import_batch_size):
+            rows, deltas = await run_in_threadpool(validate_batch, principal.id, category_ids, batch, report)
+            if not rows:
+                continue
+            async with db_runner() as db:
+                event = await db.run(insert_batch, principal.id, rows, deltas, report)
+            await dashboard_events.publish(principal.id, event)
+    except ImportFormatError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return report.result()
+
+
+def _update_fields(data: TransactionUpdate) -> dict:
+    """Fields an update sets; non-nullable fields sent as null are ignored, like fields left out."""
+    return {
+        field: value
+        for field, value in data.model_dump(exclude_unset=True).items()
+        if value is not None or field == "description"
+    }
+
+
+def _apply_batch(
+    db: Session, user_id: int, batch: TransactionBatchRequest
+) -> Tuple[TransactionBatchResult, Optional[bytes]]:
+    """Apply a list of create/update/delete operations in one database transaction.
+    
+    Returns the result and the dashboard event to publish, if any.
+    """
+    creates = [op for op in batch.operations if op.op == "create"]
+    updates = [op for op in batch.operations if op.op == "update"]
+    deletes = [op for op in batch.operations if op.op == "delete"]
+    
+    target_ids = [op.id for op in updates + deletes]
+    if len(set(target_ids)) != len(target_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each transaction may appear in only one operation"
+        )
+    
+    def load_targets(ids):
+        return {
+            row.id: row
+            for row in db.query(
+                Transaction.id, Transaction.date, Transaction.category_id, Transaction.amount
+            ).filter(
+                Transaction.user_id == user_id,
+                Transaction.id.in_(ids)
+            )
+        }
+    
+    # Check ownership of every target with a single IN (...) query
+    existing = load_targets(target_ids) if target_ids else {}
+    missing = [transaction_id for transaction_id in target_ids if transaction_id not in existing]
+    if missing and archived_years(db) and thaw(db, user_id, missing):
+        # Archived targets are back in the hot table now
+        existing.update(load_targets(missing))
+        missing = [transaction_id for transaction_id in missing if transaction_id not in existing]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Transactions not found: {', '.join(str(i) for i in missing)}"
+        )
+    
+    changes = {op.id: _update_fields(op.data) for op in updates}
+    category_ids = {op.data.category_id for op in creates}
+    category_ids |= {change["category_id"] for change in changes.values() if "category_id" in change}
+    unknown = sorted(i for i in category_ids if category_catalog.get(db, i) is None)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Categories not found: {', '.join(str(i) for i in unknown)}"
+        )
+    
+    version = bump_data_version(db, user_id)
+    deltas = RollupDeltas()
+    created_ids = []
+    if creates:
+        rows = [{**op.data.model_dump(), "user_id": user_id, "version": version} for op in creates]
+        # One multi-row INSERT; RETURNING order is unspecified, but ids are
+        # assigned in VALUES order, so sorting maps them back to the creates.
+        # (sort_by_parameter_order would make SQLite insert row by row.)
+        table = Transaction.__table__
+        created_ids = sorted(db.scalars(table.insert().returning(table.c.id), rows))
+        for row in rows:
+            deltas.add(user_id, row["date"], row["category_id"], row["amount"])
+    
+    update_rows = []
+    for transaction_id, change in changes.items():
+        if not change:
+            continue
+        old = existing[transaction_id]
+        deltas.remove(user_id, old.date, old.category_id, old.amount)
+        deltas.add(
+            user_id,
+            change.get("date", old.date),
+            change.get("category_id", old.category_id),
+            change.get("amount", old.amount)
+        )
+        update_rows.append({"id": transaction_id, **change, "version": version})
+    if update_rows:
+        # Bulk UPDATE by primary key; ownership was checked above
+        db.execute(update(Transaction), update_rows)
+    
+    if deletes:
+        for op in deletes:
+            old = existing[op.id]
+            deltas.remove(user_id, old.date, old.category_id, old.amount)
+        db.execute(
+            delete(Transaction).where(
+                Transaction.user_id == user_id,
+                Transaction.id.in_([op.id for op in deletes])
+            ).execution_options(synchronize_session=False)
+        )
+        db.execute(TransactionTombstone.__table__.insert(), [
+            {"user_id": user_id, "transaction_id": op.id, "version": version} for op in deletes
+        ])
+    
+    event = dashboard_events.prepare(db, user_id, version, deltas.apply(db))
     db.commit()
-    db.refresh(db_transaction)
     
-    return db_transaction
+    return TransactionBatchResult(created=created_ids, updated=len(updates), deleted=len(deletes)), event
+
+
+@router.post("/batch", response_model=TransactionBatchResult)
+async def batch_transactions(
+    batch: TransactionBatchRequest,
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Create, update and delete many transactions in one request and one commit.
+    
+    All operations succeed together or none are applied.
+    """
+    if len(batch.operations) > settings.batch_max_operations:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.batch_max_operations} operations per batch"
+        )
+    
+    result, event = await db.run(_apply_batch, principal.id, batch)
+    await dashboard_events.publish(principal.id, event)
+    return result
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
-def get_transaction(
+async def get_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
 ):
     """Get a specific transaction by ID."""
-    transaction = db.query(Transaction).filter(
-        and_(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id
-        )
-    ).first()
+    transaction = await db.run(_get_user_transaction, principal.id, transaction_id)
     
     if not transaction:
         raise HTTPException(
@@ -101,20 +709,11 @@ def get_transaction(
     return transaction
 
 
-@router.put("/{transaction_id}", response_model=TransactionResponse)
-def update_transaction(
-    transaction_id: int,
-    transaction_update: TransactionUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Update an existing transaction."""
-    db_transaction = db.query(Transaction).filter(
-        and_(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id
-        )
-    ).first()
+def _update_transaction(
+    db: Session, user_id: int, transaction_id: int, transaction_update: TransactionUpdate
+) -> Tuple[Transaction, Optional[bytes]]:
+    """Apply an update; returns the row with its category and the dashboard event to publish."""
+    db_transaction = _get_user_transaction(db, user_id, transaction_id, for_write=True)
     
     if not db_transaction:
         raise HTTPException(
@@ -123,29 +722,42 @@ def update_transaction(
         )
     
     # Update fields
-    update_data = transaction_update.model_dump(exclude_unset=True)
+    update_data = _update_fields(transaction_update)
+    if "category_id" in update_data and category_catalog.get(db, update_data["category_id"]) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+    deltas = RollupDeltas()
+    deltas.remove(user_id, db_transaction.date, db_transaction.category_id, db_transaction.amount)
     for field, value in update_data.items():
         setattr(db_transaction, field, value)
+    deltas.add(user_id, db_transaction.date, db_transaction.category_id, db_transaction.amount)
+    version = db_transaction.version = bump_data_version(db, user_id)
+    event = dashboard_events.prepare(db, user_id, version, deltas.apply(db))
     
     db.commit()
-    db.refresh(db_transaction)
     
-    return db_transaction
+    return _get_user_transaction(db, user_id, transaction_id), event
 
 
-@router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_transaction(
+@router.put("/{transaction_id}", response_model=TransactionResponse)
+async def update_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    transaction_update: TransactionUpdate,
+    background_tasks: BackgroundTasks,
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
 ):
-    """Delete a transaction."""
-    db_transaction = db.query(Transaction).filter(
-        and_(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id
-        )
-    ).first()
+    """Update an existing transaction."""
+    updated, event = await db.run(_update_transaction, principal.id, transaction_id, transaction_update)
+    background_tasks.add_task(dashboard_events.publish, principal.id, event)
+    return updated
+
+
+def _delete_transaction(db: Session, user_id: int, transaction_id: int) -> Optional[bytes]:
+    """Delete a transaction, leaving a tombstone; returns the dashboard event to publish."""
+    db_transaction = _get_user_transaction(db, user_id, transaction_id, for_write=True)
     
     if not db_transaction:
         raise HTTPException(
@@ -153,7 +765,27 @@ def delete_transaction(
             detail="Transaction not found"
         )
     
+    version = bump_data_version(db, user_id)
+    deltas = RollupDeltas()
+    deltas.remove(user_id, db_transaction.date, db_transaction.category_id, db_transaction.amount)
+    rollup_rows = deltas.apply(db)
+    
+    # Leave a tombstone so synced clients learn about the delete
+    db.add(TransactionTombstone(user_id=user_id, transaction_id=transaction_id, version=version))
     db.delete(db_transaction)
+    event = dashboard_events.prepare(db, user_id, version, rollup_rows)
     db.commit()
-    
+    return event
+
+
+@router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_transaction(
+    transaction_id: int,
+    background_tasks: BackgroundTasks,
+    db: SessionRunner = Depends(get_db_runner),
+    principal: Principal = Depends(get_current_principal)
+):
+    """Delete a transaction."""
+    event = await db.run(_delete_transaction, principal.id, transaction_id)
+    background_tasks.add_task(dashboard_events.publish, principal.id, event)
     return None
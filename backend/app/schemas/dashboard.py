@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from decimal import Decimal
-from typing import List
+from datetime import date
+from typing import List, Optional
 
 
 class DashboardSummary(BaseModel):
@@ -17,3 +18,34 @@ class ChartDataItem(BaseModel):
 
 class ChartDataResponse(BaseModel):
     data: List[ChartDataItem]
+
+
+class DashboardOverview(BaseModel):
+    summary: DashboardSummary
+    expense_chart: List[ChartDataItem]
+    income_chart: List[ChartDataItem]
+    # Stream events at or below this version are already included
+    data_version: Optional[int] = None
+
+
+class TimeSeriesPoint(BaseModel):
+    period_start: date
+    income: Decimal
+    expenses: Decimal
+    balance: Decimal
+
+
+class CategoryDelta(BaseModel):
+    category_id: int
+    category: str
+    type: str
+    color: str
+    month: str  # 'YYYY-MM'
+    amount: Decimal  # Change to the month's total for this category
+    count: int  # Change to its number of transactions
+
+
+class DashboardEvent(BaseModel):
+    version: int
+    summary: DashboardSummary  # All-time totals after the write
+    changes: List[CategoryDelta]
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
+import datetime
 from datetime import date
 from decimal import Decimal
-from typing import Optional
+from typing import Annotated, List, Literal, Optional, Union
 from app.schemas.category import CategoryResponse
 
 
@@ -18,7 +19,8 @@ class TransactionCreate(TransactionBase):
 
 class TransactionUpdate(BaseModel):
     amount: Optional[Decimal] = Field(None, gt=0)
-    date: Optional[date] = None
+    # Qualified so the annotation is not shadowed by the field's own default
+    date: Optional[datetime.date] = None
     description: Optional[str] = None
     category_id: Optional[int] = None
 
@@ -41,3 +43,64 @@ class TransactionListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TransactionPage(BaseModel):
+    items: List[TransactionListResponse]
+    next_cursor: Optional[str] = None
+
+
+class TransactionSearchPage(BaseModel):
+    items: List[TransactionListResponse]
+    next_offset: Optional[int] = None
+
+
+class TransactionChanges(BaseModel):
+    items: List[TransactionListResponse]  # Created or updated since the checkpoint, oldest change first
+    deleted: List[int]  # Ids to drop; apply before items
+    next_since: str
+    has_more: bool = False
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+
+
+class BatchCreateOperation(BaseModel):
+    op: Literal["create"]
+    data: TransactionCreate
+
+
+class BatchUpdateOperation(BaseModel):
+    op: Literal["update"]
+    id: int
+    data: TransactionUpdate
+
+
+class BatchDeleteOperation(BaseModel):
+    op: Literal["delete"]
+    id: int
+
+
+BatchOperation = Annotated[
+    Union[BatchCreateOperation, BatchUpdateOperation, BatchDeleteOperation],
+    Field(discriminator="op")
+]
+
+
+class TransactionBatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1)
+
+
+class TransactionBatchResult(BaseModel):
+    created: List[int]
+    updated: int
+    deleted: int
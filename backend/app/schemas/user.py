@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
 from typing import Optional
 
 
@@ -30,3 +31,22 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     user_id: Optional[int] = None
+
+
+class Principal(BaseModel):
+    """Caller identity asserted by a verified access token, without a database lookup."""
+    id: int
+
+
+class AccountDeletionResponse(BaseModel):
+    """Progress of a background account purge."""
+    id: int
+    status: str  # pending, running, done or failed
+    total: Optional[int] = None  # Known once the purge starts
+    deleted: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.account_deletion import AccountDeletion
+from app.models.archive import TransactionArchive, archive_table
+from app.models.tombstone import TransactionTombstone
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.archive import routed_transactions
+
+logger = logging.getLogger("app.account_deletion")
+
+UNFINISHED = ("pending", "running")
+# updated_at given to a job stopped by shutdown(), so the next resume_stale() claims it at once
+_RELEASED = datetime(1970, 1, 1)
+
+
+def _now() -> datetime:
+    # Set from Python rather than the database clock so staleness checks compare like with like
+    return datetime.utcnow()
+
+
+def request_deletion(db: Session, user_id: int) -> Optional[AccountDeletion]:
+    """Delete a user's account, or schedule it when it is too large for one request.
+
+    Small accounts go in a single DELETE of the user row; ON DELETE CASCADE
+    removes their transactions, rollups and tombstones inside the database.
+    Larger ones are marked deleted (no more sign-ins) and get a job for the
+    AccountPurger, which the caller starts once it has committed.
+    Re-requesting while a purge is pending returns the existing job.
+    """
+    # Archived years count too: the cascade would delete those rows in the same statement
+    source = routed_transactions(db, lambda c: [c.user_id == user_id])
+    over_limit = db.execute(
+        select(source.id)
+        .where(source.user_id == user_id)
+        .limit(1)
+        .offset(settings.account_delete_inline_rows)
+    ).first()
+    if over_limit is None:
+        db.execute(delete(User).where(User.id == user_id))
+        return None
+
+    now = _now()
+    marked = db.execute(
+        update(User)
+        .where(User.id == user_id, User.deleted_at.is_(None))
+        .values(deleted_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not marked:
+        return db.scalars(
+            select(AccountDeletion)
+            .where(AccountDeletion.user_id == user_id)
+            .order_by(AccountDeletion.id.desc())
+            .limit(1)
+        ).first()
+    job = AccountDeletion(user_id=user_id, status="pending", deleted=0, updated_at=now)
+    db.add(job)
+    db.flush()
+    return job
+
+
+class AccountPurger:
+    """Purges large accounts in chunks on one dedicated background thread.
+
+    Each chunk deletes up to chunk_size rows by id in its own short
+    transaction and records progress on the job, so request handlers (and,
+    on SQLite, other writers) get the database between chunks. The user row
+    goes last, cascading rollups and anything written meanwhile. Jobs whose
+    progress stops for stale_seconds, e.g. after a restart, are picked up
+    again by resume_stale(); deleting by id makes re-running a chunk harmless.
+    """
+
+    def __init__(self, chunk_size: int, pause_ms: float, stale_seconds: int):
+        self.chunk_size = chunk_size
+        self.pause_ms = pause_ms
+        self.stale_seconds = stale_seconds
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Accept work again after shutdown(), e.g. when the app's lifespan runs a second time."""
+        self._stopping.clear()
+
+    def _get_executor(self) -> Executor:
+        # Created on first use, so forked server workers each get their own thread
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="account-purge")
+            return self._executor
+
+    def submit(self, job_id: int):
+        """Run a job in the background; call after the transaction creating it commits."""
+        self._get_executor().submit(self._run, job_id)
+
+    def _run(self, job_id: int):
+        try:
+            self.purge(job_id)
+        except Exception as exc:
+            logger.exception("Account purge %s failed", job_id)
+            with SessionLocal() as db:
+                db.execute(
+                    update(AccountDeletion)
+                    .where(AccountDeletion.id == job_id)
+                    .values(status="failed", error=str(exc)[:255], updated_at=_now())
+                )
+                db.commit()
+
+    def _delete_chunk(self, db: Session, table, user_id: int) -> int:
+        ids = select(table.c.id).where(table.c.user_id == user_id).limit(self.chunk_size)
+        return db.execute(delete(table).where(table.c.id.in_(ids))).rowcount
+
+    def _release(self, job_id: int):
+        with SessionLocal() as db:
+            db.execute(update(AccountDeletion).where(AccountDeletion.id == job_id).values(updated_at=_RELEASED))
+            db.commit()
+
+    def purge(self, job_id: int) -> bool:
+        """Run a job to completion on this thread; False if shutdown() stopped it first."""
+        with SessionLocal() as db:
+            job = db.get(AccountDeletion, job_id)
+            user_id = job.user_id
+            # Every archived year, read fresh rather than from the routing cache
+            archives = {
+                archive_table(year): year
+                for year in db.scalars(select(TransactionArchive.year).order_by(TransactionArchive.year.desc()))
+            }
+            transaction_tables = [Transaction.__table__, *archives]
+            total = sum(
+                db.scalar(select(func.count()).select_from(table).where(table.c.user_id == user_id))
+                for table in transaction_tables
+            )
+            job.status = "running"
+            job.total = job.deleted + total
+            job.updated_at = _now()
+            db.commit()
+
+        for table in (*transaction_tables, TransactionTombstone.__table__):
+            while True:
+                if self._stopping.is_set():
+                    self._release(job_id)
+                    return False
+                with SessionLocal() as db:
+                    count = self._delete_chunk(db, table, user_id)
+                    progress = {"updated_at": _now()}
+                    if table in transaction_tables:
+                        progress["deleted"] = AccountDeletion.deleted + count
+                    if table in archives:
+                        db.execute(
+                            update(TransactionArchive)
+                            .where(TransactionArchive.year == archives[table])
+                            .values(row_count=TransactionArchive.row_count - count)
+                        )
+                    db.execute(update(AccountDeletion).where(AccountDeletion.id == job_id).values(**progress))
+                    db.commit()
+                if count < self.chunk_size:
+                    break
+                time.sleep(self.pause_ms / 1000)
+
+        with SessionLocal() as db:
+            db.execute(delete(User).where(User.id == user_id))
+            db.execute(
+                update(AccountDeletion)
+                .where(AccountDeletion.id == job_id)
+                .values(status="done", updated_at=_now(), finished_at=_now())
+            )
+            db.commit()
+        return True
+
+    def resume_stale(self) -> List[int]:
+        """Claim and restart unfinished jobs nobody has advanced for stale_seconds."""
+        cutoff = _now() - timedelta(seconds=self.stale_seconds)
+        claimed = []
+        with SessionLocal() as db:
+            # Nothing to resume on a database the migrations have not reached yet
+            if not inspect(db.connection()).has_table(AccountDeletion.__tablename__):
+                return claimed
+            stale = db.execute(
+                select(AccountDeletion.id, AccountDeletion.updated_at)
+                .where(AccountDeletion.status.in_(UNFINISHED), AccountDeletion.updated_at < cutoff)
+            ).all()
+            for job_id, updated_at in stale:
+                # Only one process wins each job: the others see updated_at already moved
+                won = db.execute(
+                    update(AccountDeletion)
+                    .where(AccountDeletion.id == job_id, AccountDeletion.updated_at == updated_at)
+                    .values(updated_at=_now())
+                ).rowcount
+                db.commit()
+                if won:
+                    claimed.append(job_id)
+        for job_id in claimed:
+            self.submit(job_id)
+        return claimed
+
+    def shutdown(self):
+        """Stop after the current chunk; the next resume_stale() in any process carries on."""
+        self._stopping.set()
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+account_purger = AccountPurger(
+    settings.account_purge_chunk_size,
+    settings.account_purge_pause_ms,
+    settings.account_purge_stale_seconds,
+)
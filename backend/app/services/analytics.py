@@ -0,0 +1,289 @@
+"""
+Columnar per-user snapshots for the dashboard's raw-row aggregations.
+
+Date ranges that do not cover whole months cannot be answered from monthly
+rollups, so the dashboard sums raw transactions for them. With
+ANALYTICS_CACHE_MB set, each active user's history is instead loaded once
+into parallel arrays sorted by date: amounts in integer cents, date
+ordinals, month numbers and category ids (20 bytes a row). A range becomes
+two binary searches, and the sums and group-bys run over the slice; with
+NumPy installed they are vectorized, otherwise plain loops over the arrays.
+Either way no ORM objects or Decimals are built per row.
+
+Snapshots are stamped with the user's data version and only served while it
+is current. Write handlers record row changes through RollupDeltas, and
+after commit they patch the writer's own snapshot to the new version.
+Snapshots of other processes, or any that miss a patch (or would need a very
+large one), are rebuilt on their next use. Least recently used snapshots are dropped to stay in budget.
+"""
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, cast, event, func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.archive import routed_transactions
+from app.services.data_version import get_data_version
+
+try:
+    import numpy as np
+except ImportError:  # Optional: the same results, computed with Python loops
+    np = None
+
+# (sign, user_id, date, category_id, cents): +1 for a row that now exists, -1 for one that no longer does
+Change = Tuple[int, int, date, int, int]
+
+# Each patched row shifts the arrays; past this many (bulk imports), rebuilding is cheaper
+MAX_PATCH_CHANGES = 1000
+
+
+def from_cents(cents: int) -> Decimal:
+    """Decimal with two places, like the SQL sums; zero stays a bare 0 as there."""
+    return Decimal(cents).scaleb(-2) if cents else Decimal(0)
+
+
+def _month_number(on_date: date) -> int:
+    return on_date.year * 12 + on_date.month - 1
+
+
+class ColumnarSnapshot:
+    """One user's transactions as parallel columns sorted by date; never changed once built."""
+
+    __slots__ = ("version", "days", "months", "categories", "cents")
+
+    def __init__(self, version: int, days: array, months: array, categories: array, cents: array):
+        self.version = version
+        self.days = days  # date ordinals, ascending
+        self.months = months  # year * 12 + month - 1
+        self.categories = categories
+        self.cents = cents
+
+    @classmethod
+    def build(cls, rows, version: int) -> "ColumnarSnapshot":
+        """From (date, category_id, cents) rows ordered by date."""
+        days, months, categories, cents = array("i"), array("i"), array("i"), array("q")
+        for on_date, category_id, amount in rows:
+            days.append(on_date.toordinal())
+            months.append(_month_number(on_date))
+            categories.append(category_id)
+            cents.append(amount)
+        return cls(version, days, months, categories, cents)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (self.days, self.months, self.categories, self.cents))
+
+    def _bounds(self, start_date: Optional[date], end_date: Optional[date]) -> Tuple[int, int]:
+        low = bisect_left(self.days, start_date.toordinal()) if start_date else 0
+        high = bisect_right(self.days, end_date.toordinal()) if end_date else len(self.days)
+        return low, high
+
+    def category_totals(self, start_date: Optional[date], end_date: Optional[date]) -> Dict[int, int]:
+        """Cents per category over the range, for categories with at least one row in it."""
+        low, high = self._bounds(start_date, end_date)
+        if low >= high:
+            return {}
+        if np is not None:
+            categories = np.frombuffer(self.categories, dtype=np.int32)[low:high]
+            cents = np.frombuffer(self.cents, dtype=np.int64)[low:high]
+            counts = np.bincount(categories)
+            sums = np.bincount(categories, weights=cents)
+            return {int(category_id): int(round(sums[category_id])) for category_id in np.flatnonzero(counts)}
+        totals = defaultdict(int)
+        for category_id, amount in zip(self.categories[low:high], self.cents[low:high]):
+            totals[category_id] += amount
+        return dict(totals)
+
+    def bucket_totals(
+        self, start_date: Optional[date], end_date: Optional[date], period: str
+    ) -> List[Tuple[date, int, int]]:
+        """(bucket start, category_id, cents) for every day, week (from Monday) or month with rows."""
+        low, high = self._bounds(start_date, end_date)
+        if low >= high:
+            return []
+        if np is not None:
+            if period == "month":
+                keys = np.frombuffer(self.months, dtype=np.int32)[low:high].astype(np.int64)
+            else:
+                keys = np.frombuffer(self.days, dtype=np.int32)[low:high].astype(np.int64)
+                if period == "week":
+                    # Ordinal 1 (0001-01-01) is a Monday
+                    keys -= (keys - 1) % 7
+            categories = np.frombuffer(self.categories, dtype=np.int32)[low:high]
+            width = int(categories.max()) + 1
+            groups, inverse = np.unique(keys * width + categories, return_inverse=True)
+            sums = np.bincount(inverse, weights=np.frombuffer(self.cents, dtype=np.int64)[low:high])
+            totals = zip((int(key) for key in groups // width), (int(c) for c in groups % width), sums)
+        else:
+            keys = self.months[low:high] if period == "month" else self.days[low:high]
+            grouped = defaultdict(int)
+            for key, category_id, amount in zip(keys, self.categories[low:high], self.cents[low:high]):
+                if period == "week":
+                    key -= (key - 1) % 7
+                grouped[(key, category_id)] += amount
+            totals = ((key, category_id, amount) for (key, category_id), amount in grouped.items())
+
+        if period == "month":
+            return [(date(key // 12, key % 12 + 1, 1), category_id, int(round(amount))) for key, category_id, amount in totals]
+        return [(date.fromordinal(key), category_id, int(round(amount))) for key, category_id, amount in totals]
+
+    def patched(self, version: int, changes: List[Change]) -> Optional["ColumnarSnapshot"]:
+        """A copy with the changes applied, or None if one does not match a row."""
+        days, months, categories, cents = (
+            array(self.days.typecode, self.days),
+            array(self.months.typecode, self.months),
+            array(self.categories.typecode, self.categories),
+            array(self.cents.typecode, self.cents),
+        )
+        for sign, _, on_date, category_id, amount in changes:
+            ordinal = on_date.toordinal()
+            if sign > 0:
+                position = bisect_right(days, ordinal)
+                days.insert(position, ordinal)
+                months.insert(position, _month_number(on_date))
+                categories.insert(position, category_id)
+                cents.insert(position, amount)
+                continue
+            # Rows are interchangeable for sums: drop any one with the same values
+            for position in range(bisect_left(days, ordinal), bisect_right(days, ordinal)):
+                if categories[position] == category_id and cents[position] == amount:
+                    break
+            else:
+                return None
+            for column in (days, months, categories, cents):
+                del column[position]
+        return ColumnarSnapshot(version, days, months, categories, cents)
+
+
+def _load(db: Session, user_id: int) -> Optional[ColumnarSnapshot]:
+    """Build a snapshot, or None if the user wrote while it was being read."""
+    version = get_data_version(db, user_id)
+    source = routed_transactions(db, lambda c: [c.user_id == user_id])
+    rows = db.execute(
+        select(source.date, source.category_id, cast(func.round(source.amount * 100), Integer))
+        .where(source.user_id == user_id)
+        .order_by(source.date)
+    )
+    snapshot = ColumnarSnapshot.build(rows, version)
+    # Reads may not share one database snapshot (SQLite autocommits SELECTs),
+    # so only keep rows known to belong to that version
+    if get_data_version(db, user_id) != version:
+        return None
+    return snapshot
+
+
+class AnalyticsCache:
+    """Process-wide LRU of columnar snapshots, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[int, ColumnarSnapshot]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._patches = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def snapshot(self, db: Session, user_id: int) -> Optional[ColumnarSnapshot]:
+        """The user's snapshot at their current data version, built if needed; None to fall back to SQL."""
+        version = get_data_version(db, user_id)
+        with self._lock:
+            snapshot = self._snapshots.get(user_id)
+            if snapshot is not None and snapshot.version == version:
+                self._snapshots.move_to_end(user_id)
+                self._hits += 1
+                return snapshot
+            self._misses += 1
+        snapshot = _load(db, user_id)
+        if snapshot is not None:
+            self._store(user_id, snapshot, replacing=None)
+        return snapshot
+
+    def _store(self, user_id: int, snapshot: Optional[ColumnarSnapshot], replacing: Optional[ColumnarSnapshot]):
+        """Put (or with None, drop) a user's snapshot; with replacing, only if that is still the current one."""
+        with self._lock:
+            current = self._snapshots.get(user_id)
+            if replacing is not None and current is not replacing:
+                return
+            if current is not None and snapshot is not None and snapshot.version < current.version:
+                return
+            if current is not None:
+                del self._snapshots[user_id]
+                self._bytes -= current.nbytes
+            # Too big to keep at all: it served the request that built it
+            if snapshot is None or snapshot.nbytes > self.max_bytes:
+                return
+            self._snapshots[user_id] = snapshot
+            self._bytes += snapshot.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._snapshots.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def apply(self, versions: Dict[int, int], changes: List[Change]):
+        """Bring cached snapshots up to the versions a commit just wrote."""
+        for user_id, version in versions.items():
+            with self._lock:
+                snapshot = self._snapshots.get(user_id)
+            if snapshot is None or snapshot.version >= version:
+                continue
+            patched = None
+            own = [change for change in changes if change[1] == user_id]
+            if snapshot.version == version - 1 and len(own) <= MAX_PATCH_CHANGES:
+                patched = snapshot.patched(version, own)
+            if patched is not None:
+                self._patches += 1
+            self._store(user_id, patched, replacing=snapshot)
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._snapshots),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "patches": self._patches,
+                "numpy": np is not None,
+            }
+
+
+analytics_cache = AnalyticsCache(int(settings.analytics_cache_mb * 1024 * 1024))
+
+
+def record_changes(db: Session, changes):
+    """Remember (sign, user_id, date, category_id, amount) row changes to patch snapshots after commit."""
+    if analytics_cache.enabled:
+        db.info.setdefault("analytics_changes", []).extend(
+            (sign, user_id, on_date, category_id, int((Decimal(amount) * 100).to_integral_value()))
+            for sign, user_id, on_date, category_id, amount in changes
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _patch_on_commit(session):
+    # bump_data_version records the versions each transaction writes
+    versions = session.info.pop("data_versions", None)
+    changes = session.info.pop("analytics_changes", [])
+    if versions and analytics_cache.enabled:
+        analytics_cache.apply(versions, changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("data_versions", None)
+    session.info.pop("analytics_changes", None)
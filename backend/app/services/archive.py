@@ -0,0 +1,210 @@
+"""
+Cold storage for old transactions: one archive table per calendar year.
+
+``python archive.py`` moves transactions dated before the last
+ARCHIVE_KEEP_YEARS years out of the hot ``transactions`` table into
+``transactions_archive_<year>`` tables, so the hot table and the indexes
+every write maintains only cover recent data. Rollups are untouched: moving
+a row does not change any total.
+
+Reads go through routed_transactions(), which returns Transaction itself
+while the requested date range reaches no archived year (the common, recent
+case costs nothing extra) and otherwise a UNION ALL over the hot table and
+just the archives in range. Updating or deleting an archived row first moves
+it back to the hot table (thaw), so every write path keeps working on
+Transaction alone.
+"""
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, union_all, update
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.database import ids_never_reused
+from app.models.archive import TransactionArchive, archive_table
+from app.models.transaction import Transaction
+
+# Copied as-is between the hot table and the archives
+TRANSACTION_COLUMNS = ("id", "amount", "date", "description", "user_id", "category_id", "created_at", "version")
+
+
+class ArchiveCatalog:
+    """Process-wide list of archived years, reloaded at most every ttl seconds.
+
+    The archiver registers a year, then waits out the TTL before moving any
+    row into it, so every process routes reads to an archive before it holds data.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._years: Optional[Tuple[int, ...]] = None
+        self._loaded_at = 0.0
+
+    def years(self, db: Session) -> Tuple[int, ...]:
+        with self._lock:
+            years, loaded_at = self._years, self._loaded_at
+        if years is not None and time.monotonic() - loaded_at < self.ttl_seconds:
+            return years
+        years = tuple(db.scalars(select(TransactionArchive.year).order_by(TransactionArchive.year.desc())))
+        with self._lock:
+            self._years, self._loaded_at = years, time.monotonic()
+        return years
+
+    def invalidate(self):
+        with self._lock:
+            self._years = None
+
+
+archive_catalog = ArchiveCatalog(settings.archive_catalog_ttl_seconds)
+
+
+def archived_years(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[int]:
+    """Archived years overlapping the date range, newest first."""
+    return [
+        year for year in archive_catalog.years(db)
+        if (start_date is None or year >= start_date.year) and (end_date is None or year <= end_date.year)
+    ]
+
+
+def partition_tables(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None) -> list:
+    """The hot transactions table, then the archive tables the date range reaches."""
+    return [Transaction.__table__, *(archive_table(year) for year in archived_years(db, start_date, end_date))]
+
+
+def routed_transactions(
+    db: Session,
+    where: Callable[..., Iterable],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: Optional[int] = None
+):
+    """Transaction, or an alias of it over the hot table plus the archives the range reaches.
+
+    `where(columns)` returns one partition's filters and is called with each
+    table's columns, so every branch is pruned by its own indexes. With
+    `limit`, each branch also keeps only its newest `limit` rows by (date, id),
+    which is all a keyset page can use. Callers filter, order and limit the
+    result exactly as they would Transaction.
+    """
+    tables = partition_tables(db, start_date, end_date)
+    if len(tables) == 1:
+        return Transaction
+
+    branches = []
+    for table in tables:
+        branch = select(*(table.c[name] for name in TRANSACTION_COLUMNS)).where(*where(table.c))
+        if limit is not None:
+            branch = select(branch.order_by(table.c.date.desc(), table.c.id.desc()).limit(limit).subquery())
+        branches.append(branch)
+    return aliased(Transaction, union_all(*branches).subquery("routed_transactions"))
+
+
+def thaw(db: Session, user_id: int, transaction_ids: Iterable[int]) -> List[int]:
+    """Move the user's archived rows among these ids back to the hot table (no commit).
+
+    Returns the ids moved. Their id, version and values are unchanged, and
+    the next archive run moves them out again if they are still old.
+    """
+    remaining = set(transaction_ids)
+    moved = []
+    for year in archive_catalog.years(db):
+        if not remaining:
+            break
+        table = archive_table(year)
+        found = db.scalars(
+            select(table.c.id).where(table.c.user_id == user_id, table.c.id.in_(remaining)).with_for_update()
+        ).all()
+        if not found:
+            continue
+        _move(db, table, Transaction.__table__, found)
+        db.execute(
+            update(TransactionArchive)
+            .where(TransactionArchive.year == year)
+            .values(row_count=TransactionArchive.row_count - len(found))
+        )
+        remaining.difference_update(found)
+        moved.extend(found)
+    return moved
+
+
+def _move(db: Session, source, target, ids: List[int]):
+    db.execute(target.insert().from_select(
+        list(TRANSACTION_COLUMNS),
+        select(*(source.c[name] for name in TRANSACTION_COLUMNS)).where(source.c.id.in_(ids))
+    ))
+    db.execute(delete(source).where(source.c.id.in_(ids)))
+
+
+def _year_range(year: int):
+    return Transaction.date >= date(year, 1, 1), Transaction.date < date(year + 1, 1, 1)
+
+
+def years_to_archive(db: Session, before_year: int) -> List[int]:
+    """Years before before_year that still have rows in the hot table, oldest first."""
+    oldest = db.scalar(select(func.min(Transaction.date)))
+    if oldest is None:
+        return []
+    return [
+        year for year in range(oldest.year, before_year)
+        if db.execute(select(Transaction.id).where(*_year_range(year)).limit(1)).first() is not None
+    ]
+
+
+def register_years(db: Session, years: List[int]) -> List[int]:
+    """Create archive tables for these years and record them (commits); returns the newly added years."""
+    known = set(db.scalars(select(TransactionArchive.year)))
+    added = [year for year in years if year not in known]
+    for year in added:
+        archive_table(year).create(bind=db.connection(), checkfirst=True)
+        db.add(TransactionArchive(year=year, row_count=0))
+    db.commit()
+    archive_catalog.invalidate()
+    return added
+
+
+def archive_year(db: Session, year: int, chunk_size: int, progress: Optional[Callable[[int], None]] = None) -> int:
+    """Move one registered year's rows out of the hot table, chunk_size rows per commit.
+
+    Every chunk is a short transaction, so the API keeps writing in between.
+    Returns the number of rows moved. Archived rows keep their ids, so the hot
+    table must never hand one out again (see the migrations).
+    """
+    if not ids_never_reused(db.connection(), Transaction.__tablename__):
+        raise RuntimeError("transactions can reuse ids of deleted rows; run `python migrate.py` before archiving")
+    table = archive_table(year)
+    moved = 0
+    while True:
+        ids = db.scalars(
+            select(Transaction.id)
+            .where(*_year_range(year))
+            .order_by(Transaction.id)
+            .limit(chunk_size)
+            .with_for_update()
+        ).all()
+        if not ids:
+            return moved
+        _move(db, Transaction.__table__, table, ids)
+        db.execute(
+            update(TransactionArchive)
+            .where(TransactionArchive.year == year)
+            .values(row_count=TransactionArchive.row_count + len(ids))
+        )
+        db.commit()
+        moved += len(ids)
+        if progress is not None:
+            progress(moved)
+
+
+def archive_status(db: Session) -> Dict[str, object]:
+    """Row counts per storage partition, for the CLI."""
+    return {
+        "hot": db.scalar(select(func.count()).select_from(Transaction)),
+        "archives": {
+            row.year: row.row_count
+            for row in db.query(TransactionArchive).order_by(TransactionArchive.year)
+        },
+    }
@@ -1,11 +1,21 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.services.cache import TTLCache
 
 # Password hashing - using pbkdf2_sha256 for better compatibility
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=settings.password_hash_rounds
+)
+
+# Verified token claims, keyed by token hash so raw tokens are never held
+token_cache = TTLCache(settings.token_cache_size, settings.token_cache_ttl_seconds)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -43,3 +53,21 @@ def decode_token(token: str) -> Optional[int]:
         return int(user_id)
     except JWTError:
         return None
+
+
+def decode_token_cached(token: str) -> Optional[int]:
+    """Like decode_token, but remembers verified tokens until they expire."""
+    key = hashlib.sha256(token.encode()).digest()
+    user_id = token_cache.get(key)
+    if user_id is not None:
+        return user_id
+
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+    expires_in = payload.get("exp", time.time() + settings.token_cache_ttl_seconds) - time.time()
+    token_cache.set(key, user_id, ttl=expires_in)
+    return user_id
@@ -0,0 +1,90 @@
+import json
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.schemas.category import CategoryResponse
+from app.services.etag import make_etag
+
+
+class _CatalogSnapshot:
+    """Immutable view of the categories table, indexed by id and by type."""
+
+    def __init__(self, categories: List[CategoryResponse]):
+        self.all = categories
+        self.by_id: Dict[int, CategoryResponse] = {c.id: c for c in categories}
+        self.by_type: Dict[str, List[CategoryResponse]] = {}
+        for category in categories:
+            self.by_type.setdefault(category.type, []).append(category)
+        payload = json.dumps([c.model_dump() for c in categories], sort_keys=True)
+        self.etag = make_etag(payload.encode())
+
+
+class CategoryCatalog:
+    """Process-wide, read-mostly cache of categories, loaded once and reloaded after changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_CatalogSnapshot] = None
+        self._generation = 0
+
+    def snapshot(self, db: Session) -> _CatalogSnapshot:
+        """Return the current snapshot, loading it from the database if needed."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            generation = self._generation
+        # Load outside the lock: with the async engine this runs on the event
+        # loop thread, where waiting on a lock held by a suspended load would
+        # block the loop. Concurrent first loads just race to publish.
+        rows = db.query(Category).order_by(Category.id).all()
+        loaded = _CatalogSnapshot([CategoryResponse.model_validate(row) for row in rows])
+        with self._lock:
+            if self._generation != generation:
+                # Invalidated mid-load; serve what we read but don't keep it
+                return loaded
+            if self._snapshot is None:
+                self._snapshot = loaded
+            return self._snapshot
+
+    def all(self, db: Session) -> List[CategoryResponse]:
+        return self.snapshot(db).all
+
+    def by_type(self, db: Session, category_type: str) -> List[CategoryResponse]:
+        return self.snapshot(db).by_type.get(category_type, [])
+
+    def get(self, db: Session, category_id: int) -> Optional[CategoryResponse]:
+        return self.snapshot(db).by_id.get(category_id)
+
+    def invalidate(self):
+        """Drop the snapshot so the next read reloads it."""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+
+category_catalog = CategoryCatalog()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_category_changes(session, flush_context):
+    """Remember that this transaction wrote categories."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Category):
+            session.info["categories_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("categories_changed", False):
+        category_catalog.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("categories_changed", None)
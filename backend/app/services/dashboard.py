@@ -0,0 +1,257 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.rollup import MonthlyRollup
+from app.schemas.dashboard import DashboardOverview, DashboardSummary, ChartDataItem, TimeSeriesPoint
+from app.services.analytics import analytics_cache, from_cents
+from app.services.archive import routed_transactions
+from app.services.category_catalog import category_catalog
+from app.services.rollup import year_month
+
+DEFAULT_CHART_COLORS = {"expense": "#6B7280", "income": "#10B981"}
+
+
+def _month_aligned(start_date: Optional[date], end_date: Optional[date]) -> bool:
+    """True when the range covers whole months, so rollups can answer it."""
+    if start_date is not None and start_date.day != 1:
+        return False
+    if end_date is not None:
+        last_day = calendar.monthrange(end_date.year, end_date.month)[1]
+        if end_date.day != last_day:
+            return False
+    return True
+
+
+def _rollup_query(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date], *columns):
+    query = db.query(*columns).filter(MonthlyRollup.user_id == user_id)
+    if start_date:
+        query = query.filter(MonthlyRollup.year_month >= year_month(start_date))
+    if end_date:
+        query = query.filter(MonthlyRollup.year_month <= year_month(end_date))
+    return query
+
+
+def _transaction_source(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    """Transaction, or a union with the archived years the range reaches."""
+    def where(c):
+        clauses = [c.user_id == user_id]
+        if start_date:
+            clauses.append(c.date >= start_date)
+        if end_date:
+            clauses.append(c.date <= end_date)
+        return clauses
+
+    return routed_transactions(db, where, start_date, end_date)
+
+
+def _transaction_query(db: Session, source, user_id: int, start_date: Optional[date], end_date: Optional[date], *columns):
+    query = db.query(*columns).filter(source.user_id == user_id)
+    if start_date:
+        query = query.filter(source.date >= start_date)
+    if end_date:
+        query = query.filter(source.date <= end_date)
+    return query
+
+
+def _snapshot(db: Session, user_id: int):
+    """The user's columnar snapshot when the analytics cache is on and can serve one."""
+    return analytics_cache.snapshot(db, user_id) if analytics_cache.enabled else None
+
+
+def _category_totals(
+    db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]
+) -> List[Tuple[int, Decimal]]:
+    """Sum amounts per category, from rollups for whole months or raw rows otherwise."""
+    if _month_aligned(start_date, end_date):
+        rows = _rollup_query(
+            db, user_id, start_date, end_date,
+            MonthlyRollup.category_id,
+            func.sum(MonthlyRollup.total).label("total")
+        ).group_by(
+            MonthlyRollup.category_id
+        ).having(
+            func.sum(MonthlyRollup.count) > 0
+        ).all()
+    else:
+        snapshot = _snapshot(db, user_id)
+        if snapshot is not None:
+            totals = snapshot.category_totals(start_date, end_date)
+            return [(category_id, from_cents(cents)) for category_id, cents in totals.items()]
+        source = _transaction_source(db, user_id, start_date, end_date)
+        rows = _transaction_query(
+            db, source, user_id, start_date, end_date,
+            source.category_id,
+            func.sum(source.amount).label("total")
+        ).group_by(
+            source.category_id
+        ).all()
+    return [(row.category_id, Decimal(str(row.total)) if row.total else Decimal(0)) for row in rows]
+
+
+def build_overview(
+    db: Session, user_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> DashboardOverview:
+    """Compute summary and both charts from one grouped query over the requested range.
+
+    Rows are grouped by category_id only; the category type, name and color
+    come from the in-process category catalog, so no join is needed.
+    """
+    catalog = category_catalog.snapshot(db)
+    totals = {"income": Decimal(0), "expense": Decimal(0)}
+    charts = {"income": [], "expense": []}
+
+    for category_id, amount in sorted(_category_totals(db, user_id, start_date, end_date)):
+        category = catalog.by_id.get(category_id)
+        if category is None or category.type not in totals:
+            continue
+        totals[category.type] += amount
+        charts[category.type].append(
+            ChartDataItem(
+                category=category.name,
+                amount=amount,
+                color=category.color or DEFAULT_CHART_COLORS[category.type]
+            )
+        )
+
+    return DashboardOverview(
+        summary=DashboardSummary(
+            total_income=totals["income"],
+            total_expenses=totals["expense"],
+            balance=totals["income"] - totals["expense"]
+        ),
+        expense_chart=charts["expense"],
+        income_chart=charts["income"]
+    )
+
+
+def bucket_start(on_date: date, period: str) -> date:
+    """First day of the day/week/month bucket containing a date (weeks start on Monday)."""
+    if period == "day":
+        return on_date
+    if period == "week":
+        return on_date - timedelta(days=on_date.weekday())
+    return on_date.replace(day=1)
+
+
+def _next_bucket(start: date, period: str) -> Optional[date]:
+    """First day of the following bucket; None after the last one before date.max."""
+    try:
+        if period == "day":
+            return start + timedelta(days=1)
+        if period == "week":
+            return start + timedelta(days=7)
+        return (start + timedelta(days=32)).replace(day=1)
+    except OverflowError:
+        return None
+
+
+def bucket_count(first: date, last: date, period: str) -> int:
+    """Number of buckets from the one starting at first to the one starting at last."""
+    if period == "day":
+        return (last - first).days + 1
+    if period == "week":
+        return (last - first).days // 7 + 1
+    return (last.year - first.year) * 12 + last.month - first.month + 1
+
+
+class TimeSeriesTooLong(ValueError):
+    """The requested series would have more than settings.dashboard_max_buckets points."""
+
+
+def _raw_bucket_totals(
+    db: Session, user_id: int, period: str, start_date: Optional[date], end_date: Optional[date]
+) -> List[Tuple[date, int, Decimal]]:
+    """(bucket start, category_id, amount) from the analytics snapshot, or raw rows grouped in SQL."""
+    snapshot = _snapshot(db, user_id)
+    if snapshot is not None:
+        return [
+            (bucket, category_id, from_cents(cents))
+            for bucket, category_id, cents in snapshot.bucket_totals(start_date, end_date, period)
+        ]
+    source = _transaction_source(db, user_id, start_date, end_date)
+    rows = _transaction_query(
+        db, source, user_id, start_date, end_date,
+        source.date,
+        source.category_id,
+        func.sum(source.amount).label("total")
+    ).group_by(
+        source.date, source.category_id
+    ).all()
+    return [(bucket_start(row.date, period), row.category_id, row.total) for row in rows]
+
+
+def build_timeseries(
+    db: Session,
+    user_id: int,
+    period: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> List[TimeSeriesPoint]:
+    """Income and expenses per day, week or month, with empty buckets filled in.
+
+    Raises TimeSeriesTooLong rather than fill in more than
+    settings.dashboard_max_buckets buckets.
+
+    Monthly series over whole months come from rollups; everything else is
+    grouped by (date, category_id) in SQL, or read from the user's analytics
+    snapshot, and folded into buckets here.
+    """
+    if period == "month" and _month_aligned(start_date, end_date):
+        rows = _rollup_query(
+            db, user_id, start_date, end_date,
+            MonthlyRollup.year_month,
+            MonthlyRollup.category_id,
+            func.sum(MonthlyRollup.total).label("total")
+        ).group_by(
+            MonthlyRollup.year_month, MonthlyRollup.category_id
+        ).having(
+            func.sum(MonthlyRollup.count) > 0
+        ).all()
+        points = [
+            (date(int(row.year_month[:4]), int(row.year_month[5:7]), 1), row.category_id, row.total)
+            for row in rows
+        ]
+    else:
+        points = _raw_bucket_totals(db, user_id, period, start_date, end_date)
+
+    catalog = category_catalog.snapshot(db)
+    buckets = defaultdict(lambda: {"income": Decimal(0), "expense": Decimal(0)})
+    for bucket, category_id, total in points:
+        category = catalog.by_id.get(category_id)
+        if category is None or category.type not in ("income", "expense"):
+            continue
+        buckets[bucket][category.type] += Decimal(str(total)) if total else Decimal(0)
+
+    if not buckets and (start_date is None or end_date is None):
+        return []
+
+    first = bucket_start(start_date, period) if start_date else min(buckets)
+    last = bucket_start(end_date, period) if end_date else max(buckets)
+    count = bucket_count(first, last, period)
+    if count > settings.dashboard_max_buckets:
+        raise TimeSeriesTooLong(
+            f"{count} {period} buckets requested, at most {settings.dashboard_max_buckets} are served; "
+            "narrow the date range or use a longer period"
+        )
+
+    series = []
+    current = first
+    while current is not None and current <= last:
+        values = buckets.get(current, {"income": Decimal(0), "expense": Decimal(0)})
+        series.append(
+            TimeSeriesPoint(
+                period_start=current,
+                income=values["income"],
+                expenses=values["expense"],
+                balance=values["income"] - values["expense"]
+            )
+        )
+        current = _next_bucket(current, period)
+    return series
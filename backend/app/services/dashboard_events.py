@@ -0,0 +1,184 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.schemas.dashboard import CategoryDelta, DashboardEvent
+from app.services.category_catalog import category_catalog
+from app.services.dashboard import DEFAULT_CHART_COLORS, build_overview
+from app.services.rollup import CENT
+
+# Sent to a subscriber that fell too far behind; it should refetch instead
+RESYNC = b"resync"
+
+
+class Subscription:
+    """Messages published to one channel since subscribing."""
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        """Wait up to `timeout` seconds for the next message; None if nothing arrived."""
+        raise NotImplementedError
+
+
+class Broker:
+    """Publish/subscribe of byte messages on named channels."""
+
+    def has_subscribers(self, channel: str) -> bool:
+        """Whether publishing could reach anyone; brokers that cannot tell say True."""
+        return True
+
+    async def publish(self, channel: str, message: bytes):
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> AsyncIterator[Subscription]:
+        """Async context manager yielding a Subscription for the channel."""
+        raise NotImplementedError
+
+
+class _QueueSubscription(Subscription):
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryBroker(Broker):
+    """In-process fan-out; the default. Reaches streams served by this process only.
+
+    Publish and subscribe run on the event loop. Each subscriber gets a
+    bounded queue; one that falls behind has its backlog replaced by RESYNC.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+
+    def has_subscribers(self, channel: str) -> bool:
+        return bool(self._queues.get(channel))
+
+    async def publish(self, channel: str, message: bytes):
+        for queue in list(self._queues.get(channel, ())):
+            if queue.full():
+                # Too far behind to catch up event by event
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+            else:
+                queue.put_nowait(message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        queue = asyncio.Queue(self.queue_size)
+        self._queues.setdefault(channel, set()).add(queue)
+        try:
+            yield _QueueSubscription(queue)
+        finally:
+            queues = self._queues.get(channel)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._queues[channel]
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return message["data"] if message else None
+
+
+class RedisBroker(Broker):
+    """Redis PUBLISH/SUBSCRIBE, so a write on one worker reaches streams on all of them.
+
+    Any Redis-compatible server works, including a local stand-in. Every open
+    stream holds one subscriber connection.
+    """
+
+    def __init__(self, url: str, prefix: str = "smartfinance:"):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("DASHBOARD_EVENTS_URL needs the 'redis' package installed") from exc
+        self._client = redis_asyncio.from_url(url)
+        self._prefix = prefix
+
+    async def publish(self, channel: str, message: bytes):
+        await self._client.publish(self._prefix + channel, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self._prefix + channel)
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+
+def broker_from_url(url: Optional[str]) -> Broker:
+    """Pick a broker from a URL: unset or memory:// for in-process, redis:// for shared."""
+    if not url or url.startswith("memory://"):
+        return MemoryBroker(settings.dashboard_events_queue_size)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported events URL: {url}")
+
+
+_event_adapter = TypeAdapter(DashboardEvent)
+
+
+class DashboardEvents:
+    """Pushes each user's dashboard changes to their open streams.
+
+    Write handlers call prepare() inside their transaction, which returns
+    None unless a stream may be listening, then publish() after commit.
+    """
+
+    def __init__(self, broker: Broker):
+        self.broker = broker
+
+    @staticmethod
+    def _channel(user_id: int) -> str:
+        return f"dashboard:{user_id}"
+
+    def prepare(self, db: Session, user_id: int, version: int, rollup_rows: List[dict]) -> Optional[bytes]:
+        """Encode the event for a write: new all-time totals and the rollup buckets it changed."""
+        if not rollup_rows or not self.broker.has_subscribers(self._channel(user_id)):
+            return None
+        catalog = category_catalog.snapshot(db)
+        changes = []
+        for row in rollup_rows:
+            category = catalog.by_id.get(row["category_id"])
+            if category is None:
+                continue
+            changes.append(CategoryDelta(
+                category_id=category.id,
+                category=category.name,
+                type=category.type,
+                color=category.color or DEFAULT_CHART_COLORS[category.type],
+                month=row["year_month"],
+                amount=row["total"].quantize(CENT),
+                count=row["count"]
+            ))
+        event = DashboardEvent(version=version, summary=build_overview(db, user_id).summary, changes=changes)
+        return _event_adapter.dump_json(event)
+
+    async def publish(self, user_id: int, event: Optional[bytes]):
+        if event is not None:
+            await self.broker.publish(self._channel(user_id), event)
+
+    def subscribe(self, user_id: int) -> AsyncIterator[Subscription]:
+        return self.broker.subscribe(self._channel(user_id))
+
+
+dashboard_events = DashboardEvents(broker_from_url(settings.dashboard_events_url))
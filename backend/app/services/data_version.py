@@ -0,0 +1,36 @@
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+
+class AccountUnavailableError(Exception):
+    """The user was deleted, or is being purged, so their data can no longer change."""
+
+
+def bump_data_version(db: Session, user_id: int) -> int:
+    """Advance the user's data version and return it; call inside the transaction that writes their data.
+    
+    Rows written in that transaction are stamped with the returned version.
+    The UPDATE locks the user's row until commit, so a user's versions
+    become visible in increasing order. Write handlers authenticate from
+    token claims alone, so this is also where a deleted account's token is
+    turned away: AccountUnavailableError (a 401) rolls the write back.
+    """
+    version = db.execute(
+        update(User)
+        .where(User.id == user_id, User.deleted_at.is_(None))
+        .values(data_version=User.data_version + 1)
+        .returning(User.data_version)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if version is None:
+        raise AccountUnavailableError(user_id)
+    # Read after commit to patch cached snapshots (services/analytics.py)
+    db.info.setdefault("data_versions", {})[user_id] = version
+    return version
+
+
+def get_data_version(db: Session, user_id: int) -> int:
+    """Current data version for a user (0 for users that never wrote)."""
+    return db.execute(select(User.data_version).where(User.id == user_id)).scalar() or 0
@@ -0,0 +1,22 @@
+import hashlib
+from typing import Optional
+
+
+def make_etag(payload: bytes) -> str:
+    """Build a strong ETag from a response payload."""
+    return '"' + hashlib.sha1(payload).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
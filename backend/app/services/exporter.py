@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable
+
+from sqlalchemy.orm import Query, Session
+
+from app.database import read_db_runner
+
+EXPORT_COLUMNS = ["id", "date", "amount", "category_id", "category", "type", "description"]
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _open_cursor(db: Session, build_query: Callable[[Session], Query], chunk_rows: int):
+    query = build_query(db)
+    # Transaction, or a union with archived years (services/archive.py)
+    source = query.column_descriptions[0]["entity"]
+    query = query.with_entities(
+        source.id,
+        source.date,
+        source.amount,
+        source.category_id,
+        source.description
+    )
+    return db.execute(query.statement, execution_options={"stream_results": True, "yield_per": chunk_rows})
+
+
+def _fetch(db: Session, result, chunk_rows: int):
+    return result.fetchmany(chunk_rows)
+
+
+async def stream_export(
+    build_query: Callable[[Session], Query],
+    catalog,
+    fmt: str,
+    chunk_rows: int = 1000
+) -> AsyncIterator[str]:
+    """Yield a CSV or NDJSON export chunk by chunk from a server-side cursor.
+
+    Takes its own read session (read_db_runner) so it outlives the request's
+    dependencies while still waiting on the read pool's gate; the session is
+    released when the stream ends or the client goes away. Plain tuples are
+    fetched in chunk_rows batches so memory stays flat.
+    """
+    async with read_db_runner() as db:
+        result = await db.run(_open_cursor, build_query, chunk_rows)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if fmt == "csv":
+            writer.writerow(EXPORT_COLUMNS)
+
+        while True:
+            rows = await db.run(_fetch, result, chunk_rows)
+            if not rows:
+                break
+            for row in rows:
+                category = catalog.by_id.get(row.category_id)
+                values = [
+                    row.id,
+                    row.date.isoformat(),
+                    str(row.amount),
+                    row.category_id,
+                    category.name if category else None,
+                    category.type if category else None,
+                    row.description
+                ]
+                if fmt == "csv":
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
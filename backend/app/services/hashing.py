@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from app.config import settings
+from app.services.auth import get_password_hash, verify_password
+
+
+class HashingBusyError(Exception):
+    """Raised when too many password hashing jobs are already pending."""
+
+
+class PasswordHasher:
+    """Runs password hashing on a dedicated, bounded executor.
+
+    Keeps slow pbkdf2 work off Starlette's shared threadpool, and rejects new
+    jobs once max_pending are queued or running instead of letting them pile up.
+    """
+
+    def __init__(self, kind: str, workers: int, max_pending: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._max_seen = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        # Created on first use, so forked server workers each get their own pool
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="password-hash"
+                    )
+            return self._executor
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HashingBusyError()
+            self._pending += 1
+            self._max_seen = max(self._max_seen, self._pending)
+
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._busy_seconds += time.perf_counter() - started
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        """Queue depth and throughput counters for monitoring."""
+        with self._lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "max_pending_seen": self._max_seen,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "busy_seconds": round(self._busy_seconds, 3),
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.password_hash_executor,
+    settings.password_hash_workers,
+    settings.password_hash_max_pending
+)
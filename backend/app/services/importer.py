@@ -0,0 +1,180 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction
+from app.schemas.transaction import BulkImportResult, ImportRowError, TransactionCreate
+from app.services.dashboard_events import dashboard_events
+from app.services.data_version import bump_data_version
+from app.services.rollup import RollupDeltas
+
+CSV_COLUMNS = ("amount", "date", "category_id", "description")
+REQUIRED_COLUMNS = {"amount", "date", "category_id"}
+
+# A parsed input row: (1-based data row number, fields or parse error message)
+RawRow = Tuple[int, Optional[Dict], Optional[str]]
+
+
+class ImportFormatError(ValueError):
+    """Raised when the upload as a whole cannot be parsed (e.g. a bad CSV header)."""
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream incrementally and yield complete lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def _iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[RawRow]:
+    header: Optional[List[str]] = None
+    pending = ""
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        # A quoted field may contain newlines: keep joining until quotes balance
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+
+        fields = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip().lower() for name in fields]
+            missing = REQUIRED_COLUMNS - set(header)
+            if missing:
+                raise ImportFormatError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+            continue
+
+        row_number += 1
+        if len(fields) != len(header):
+            yield row_number, None, f"Expected {len(header)} columns, got {len(fields)}"
+            continue
+        yield row_number, dict(zip(header, fields)), None
+
+    if pending:
+        row_number += 1
+        yield row_number, None, "Unterminated quoted field"
+
+
+async def _iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[RawRow]:
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield row_number, record, None
+
+
+async def iter_batches(chunks: AsyncIterator[bytes], fmt: str, batch_size: int) -> AsyncIterator[List[RawRow]]:
+    """Parse an uploaded CSV or NDJSON stream into batches of raw rows."""
+    records = _iter_csv_records(chunks) if fmt == "csv" else _iter_ndjson_records(chunks)
+    batch: List[RawRow] = []
+    async for raw in records:
+        batch.append(raw)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportReport:
+    """Running totals and a capped per-row error list for one import."""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[ImportRowError] = []
+
+    def add_error(self, row: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(ImportRowError(row=row, error=error))
+
+    def result(self) -> BulkImportResult:
+        return BulkImportResult(
+            inserted=self.inserted,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors)
+        )
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def validate_batch(
+    user_id: int,
+    category_ids: Set[int],
+    batch: List[RawRow],
+    report: ImportReport
+) -> Tuple[List[Dict], RollupDeltas]:
+    """Validate a batch without touching the database; returns the rows to insert and their rollup deltas."""
+    rows = []
+    deltas = RollupDeltas()
+    for row_number, fields, parse_error in batch:
+        if parse_error:
+            report.add_error(row_number, parse_error)
+            continue
+        fields = {key: fields.get(key) for key in CSV_COLUMNS if key in fields}
+        if fields.get("description") == "":
+            fields["description"] = None
+        try:
+            transaction = TransactionCreate.model_validate(fields)
+        except ValidationError as e:
+            report.add_error(row_number, _validation_message(e))
+            continue
+        if transaction.category_id not in category_ids:
+            report.add_error(row_number, "Category not found")
+            continue
+
+        rows.append({**transaction.model_dump(), "user_id": user_id})
+        deltas.add(user_id, transaction.date, transaction.category_id, transaction.amount)
+    return rows, deltas
+
+
+def insert_batch(
+    db: Session,
+    user_id: int,
+    rows: List[Dict],
+    deltas: RollupDeltas,
+    report: ImportReport
+) -> bytes:
+    """Insert validated rows in one executemany and commit.
+    
+    Returns the dashboard event to publish for the batch.
+    """
+    version = bump_data_version(db, user_id)
+    for row in rows:
+        row["version"] = version
+    # Core executemany: skips ORM unit-of-work bookkeeping per row
+    db.execute(Transaction.__table__.insert(), rows)
+    event = dashboard_events.prepare(db, user_id, version, deltas.apply(db))
+    db.commit()
+    report.inserted += len(rows)
+    return event
@@ -0,0 +1,262 @@
+import contextvars
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from app.config import settings
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+class RequestStats:
+    """SQL activity of one request, filled in by the engine hooks."""
+
+    __slots__ = ("statements", "sql_seconds", "rows")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+
+
+# Set by MetricsMiddleware; threadpool workers and AsyncSession greenlets see
+# the same object because both run with a copy of the request's context
+current_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request_stats", default=None
+)
+
+
+class _RowCountingCursor:
+    """DBAPI cursor proxy that adds fetched rows to the request's stats."""
+
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats: RequestStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which a failing statement simply discards;
+    # the few internal executions without one go untimed
+    if context is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "query_started", None)
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += elapsed
+        if cursor.description is not None:
+            # Rows are fetched after this hook; count them as the result reads them
+            if context is not None and context.cursor is cursor:
+                context.cursor = _RowCountingCursor(cursor, stats)
+        elif cursor.rowcount and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+    if settings.slow_query_ms > 0 and elapsed * 1000 >= settings.slow_query_ms:
+        _log_slow_query(statement, parameters, executemany, elapsed)
+
+
+def _log_slow_query(statement: str, parameters, executemany: bool, elapsed: float):
+    """Log the SQL text only; bound values may hold user data and are redacted."""
+    if executemany:
+        redacted = f"[{len(parameters)} parameter sets redacted]"
+    elif parameters:
+        redacted = f"[{len(parameters)} parameters redacted]"
+    else:
+        redacted = "[no parameters]"
+    slow_query_logger.warning(
+        "slow query %.1f ms: %s %s", elapsed * 1000, " ".join(statement.split()), redacted
+    )
+
+
+def instrument_engine(engine):
+    """Attach timing, statement and row counting to a sync engine (or an async engine's sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus exposition format, one series per label set."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, label_values: Tuple[str, ...], value: float):
+        series = self._series.get(label_values)
+        if series is None:
+            # per-bucket counts (+Inf last), sum
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {total}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+class Counter:
+    """Monotonic counter in the Prometheus exposition format."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in sorted(self._series.items()):
+            labels = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(self.labels, label_values))
+            yield f"{self.name}{{{labels}}} {value}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Per-process request metrics, keyed by method and route template."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            "smartfinance_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+        )
+        self.duration = Histogram(
+            "smartfinance_http_request_duration_seconds", "Wall time per request.",
+            ("method", "route"), DURATION_BUCKETS
+        )
+        self.sql_duration = Histogram(
+            "smartfinance_db_time_per_request_seconds", "Time spent executing SQL per request.",
+            ("method", "route"), DURATION_BUCKETS
+        )
+        self.statements = Histogram(
+            "smartfinance_db_statements_per_request", "SQL statements executed per request.",
+            ("method", "route"), STATEMENT_BUCKETS
+        )
+        self.rows = Counter(
+            "smartfinance_db_rows_total", "Rows fetched or written by SQL, by route.", ("method", "route")
+        )
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        labels = (method, route)
+        with self._lock:
+            self.requests.inc((method, route, str(status)))
+            self.duration.observe(labels, seconds)
+            self.sql_duration.observe(labels, stats.sql_seconds)
+            self.statements.observe(labels, stats.statements)
+            self.rows.inc(labels, stats.rows)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.duration, self.sql_duration, self.statements, self.rows):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def server_timing(seconds: float, stats: RequestStats) -> str:
+    """Server-Timing header value: total time and SQL time with statement/row counts."""
+    return (
+        f"app;dur={seconds * 1000:.1f}, "
+        f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.statements} queries, {stats.rows} rows"'
+    )
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording wall time and SQL activity for every HTTP request.
+
+    Adds a Server-Timing header and feeds metrics_registry. Work that runs
+    after the response starts (streamed bodies) counts towards the metrics
+    but cannot appear in the header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(time.perf_counter() - started, stats).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            metrics_registry.record(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+                time.perf_counter() - started,
+                stats
+            )
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import date
+from typing import Optional, Tuple
+
+
+def encode_cursor(last_date: date, last_id: int) -> str:
+    """Encode the (date, id) of the last row of a page into an opaque cursor."""
+    raw = json.dumps([last_date.isoformat(), last_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[date, int]]:
+    """Decode an opaque cursor, return (date, id) if valid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_date, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return date.fromisoformat(last_date), int(last_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def encode_sync_token(version: int) -> str:
+    """Encode a user's data version into an opaque delta-sync checkpoint."""
+    raw = json.dumps(["v", version], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Optional[int]:
+    """Decode a delta-sync checkpoint, return the data version if valid."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        tag, version = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if tag != "v" or int(version) < 0:
+            return None
+        return int(version)
+    except (ValueError, TypeError):
+        return None
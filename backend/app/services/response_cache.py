@@ -0,0 +1,103 @@
+from typing import Optional
+
+from app.config import settings
+from app.services.cache import TTLCache
+
+
+class CacheBackend:
+    """Byte store behind the response cache. Keys are strings, values are response bodies."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process LRU with TTL; the default."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._cache.set(key, value, ttl=ttl)
+
+    async def clear(self):
+        self._cache.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared store for several workers or hosts, over the Redis protocol.
+
+    Any Redis-compatible server works, including a local stand-in. Bounding
+    memory is left to the server (maxmemory with an LRU eviction policy).
+    """
+
+    def __init__(self, url: str, prefix: str = "smartfinance:"):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("DASHBOARD_CACHE_URL needs the 'redis' package installed") from exc
+        self._client = redis_asyncio.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self._prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._client.set(self._prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    async def clear(self):
+        async for key in self._client.scan_iter(match=self._prefix + "*"):
+            await self._client.delete(key)
+
+
+def cache_backend_from_url(url: Optional[str]) -> CacheBackend:
+    """Pick a backend from a URL: unset or memory:// for in-process, redis:// for shared."""
+    if not url or url.startswith("memory://"):
+        return MemoryCacheBackend(settings.dashboard_cache_size, settings.dashboard_cache_ttl_seconds)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+class ResponseCache:
+    """Serialized responses keyed by (user, data version, request).
+
+    The data version is part of the key, so a write makes every older entry
+    for that user unreachable without explicit invalidation; they age out of
+    the backend on their own.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and getattr(self.backend, "enabled", True)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        return await self.backend.get(key)
+
+    async def set(self, key: str, body: bytes):
+        if self.enabled:
+            await self.backend.set(key, body, self.ttl)
+
+
+dashboard_cache = ResponseCache(
+    cache_backend_from_url(settings.dashboard_cache_url), settings.dashboard_cache_ttl_seconds
+)
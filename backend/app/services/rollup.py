@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy import func, select, delete, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.rollup import MonthlyRollup
+from app.models.transaction import Transaction
+from app.services.analytics import record_changes
+from app.services.archive import routed_transactions
+
+CENT = Decimal("0.01")
+
+
+def year_month(on_date: date) -> str:
+    """Rollup bucket key for a date, e.g. '2024-03'."""
+    return f"{on_date.year:04d}-{on_date.month:02d}"
+
+
+class RollupDeltas:
+    """Accumulates changes to monthly rollups and applies them in the caller's transaction."""
+
+    def __init__(self):
+        self._deltas = defaultdict(lambda: [Decimal(0), 0])
+        # The same changes row by row, for the analytics snapshots
+        self._changes = []
+
+    def add(self, user_id: int, on_date: date, category_id: int, amount: Decimal):
+        """Account for a transaction that now exists."""
+        delta = self._deltas[(user_id, year_month(on_date), category_id)]
+        delta[0] += Decimal(amount)
+        delta[1] += 1
+        self._changes.append((1, user_id, on_date, category_id, amount))
+
+    def remove(self, user_id: int, on_date: date, category_id: int, amount: Decimal):
+        """Account for a transaction that no longer exists."""
+        delta = self._deltas[(user_id, year_month(on_date), category_id)]
+        delta[0] -= Decimal(amount)
+        delta[1] -= 1
+        self._changes.append((-1, user_id, on_date, category_id, amount))
+
+    def apply(self, db: Session) -> List[dict]:
+        """Upsert every non-zero delta into monthly_rollups (no commit); returns the applied rows."""
+        rows = [
+            dict(user_id=user_id, year_month=bucket, category_id=category_id, total=amount, count=count)
+            for (user_id, bucket, category_id), (amount, count) in self._deltas.items()
+            if amount != 0 or count != 0
+        ]
+        self._deltas.clear()
+        record_changes(db, self._changes)
+        self._changes = []
+        if rows:
+            _upsert(db, rows)
+        return rows
+
+
+def _upsert(db: Session, rows: List[dict]):
+    table = MonthlyRollup.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        # One executemany of INSERT .. ON CONFLICT DO UPDATE for all buckets
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.year_month, table.c.category_id],
+            set_={
+                "total": table.c.total + stmt.excluded.total,
+                "count": table.c.count + stmt.excluded.count,
+            }
+        )
+        db.execute(stmt, rows)
+        return
+
+    # Portable fallback: read-modify-write inside the caller's transaction
+    for values in rows:
+        key = (values["user_id"], values["year_month"], values["category_id"])
+        row = db.get(MonthlyRollup, key, with_for_update=True)
+        if row is None:
+            db.add(MonthlyRollup(**values))
+        else:
+            row.total += values["total"]
+            row.count += values["count"]
+    db.flush()
+
+
+def _year_month_expr(db: Session, on_date):
+    """SQL expression for a transaction's rollup bucket."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", on_date)
+    return func.to_char(on_date, literal_column("'YYYY-MM'"))
+
+
+def _expected_rollups(db: Session, user_id: Optional[int] = None):
+    # Rollups cover archived years too
+    source = routed_transactions(db, lambda c: [] if user_id is None else [c.user_id == user_id])
+    bucket = _year_month_expr(db, source.date)
+    query = select(
+        source.user_id,
+        bucket.label("year_month"),
+        source.category_id,
+        func.sum(source.amount).label("total"),
+        func.count(source.id).label("count")
+    ).group_by(source.user_id, bucket, source.category_id)
+    if user_id is not None:
+        query = query.where(source.user_id == user_id)
+    return query
+
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None):
+    """Recompute rollups from raw transactions, for one user or everyone (no commit)."""
+    wipe = delete(MonthlyRollup)
+    if user_id is not None:
+        wipe = wipe.where(MonthlyRollup.user_id == user_id)
+    db.execute(wipe)
+
+    expected = _expected_rollups(db, user_id).subquery()
+    db.execute(
+        MonthlyRollup.__table__.insert().from_select(
+            ["user_id", "year_month", "category_id", "total", "count"],
+            select(expected)
+        )
+    )
+
+
+def _money(value) -> Decimal:
+    return Decimal(str(value)).quantize(CENT)
+
+
+def verify_rollups(db: Session, user_id: Optional[int] = None) -> List[str]:
+    """Compare stored rollups with raw transactions and describe every mismatch."""
+    expected = {
+        (row.user_id, row.year_month, row.category_id): (_money(row.total), row.count)
+        for row in db.execute(_expected_rollups(db, user_id))
+    }
+    stored_query = db.query(MonthlyRollup).filter(MonthlyRollup.count != 0)
+    if user_id is not None:
+        stored_query = stored_query.filter(MonthlyRollup.user_id == user_id)
+    stored = {
+        (row.user_id, row.year_month, row.category_id): (_money(row.total), row.count)
+        for row in stored_query
+    }
+
+    problems = []
+    for key in sorted(set(expected) | set(stored), key=str):
+        want = expected.get(key, (Decimal(0), 0))
+        have = stored.get(key, (Decimal(0), 0))
+        if want != have:
+            problems.append(
+                f"user={key[0]} month={key[1]} category={key[2]}: "
+                f"expected total={want[0]} count={want[1]}, found total={have[0]} count={have[1]}"
+            )
+    return problems
+
+
+def rollups_missing(db: Session) -> bool:
+    """True when transactions exist but no rollup has been built yet."""
+    has_rollups = db.query(MonthlyRollup.user_id).first() is not None
+    has_transactions = db.query(Transaction.id).first() is not None
+    return has_transactions and not has_rollups
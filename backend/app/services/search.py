@@ -0,0 +1,155 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.models.transaction import Transaction
+
+FTS_TABLE = "transactions_fts"
+
+# External-content FTS5 index over transactions.description. Rows are keyed by
+# transaction id, and the triggers keep it in step with every write path,
+# including the Core bulk inserts and deletes used by import and batch.
+# user_id is indexed too, so a match can be restricted to one user's rows
+# inside the index, before anything is counted or ranked.
+_FTS_TRIGGERS = ("transactions_fts_ai", "transactions_fts_ad", "transactions_fts_au")
+_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description,
+        user_id,
+        content='transactions',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ai AFTER INSERT ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description, user_id) VALUES (new.id, new.description, new.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_ad AFTER DELETE ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, user_id)
+        VALUES ('delete', old.id, old.description, old.user_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transactions_fts_au AFTER UPDATE OF description, user_id ON transactions BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, user_id)
+        VALUES ('delete', old.id, old.description, old.user_id);
+        INSERT INTO {FTS_TABLE}(rowid, description, user_id) VALUES (new.id, new.description, new.user_id);
+    END
+    """,
+]
+
+_fts = table(FTS_TABLE, column("rowid"))
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(q: str) -> List[str]:
+    """Split user input into word terms; punctuation and FTS operators are dropped."""
+    return _TERM.findall(q.lower())
+
+
+def _fts_table_exists(conn) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first() is not None
+
+
+class SearchIndex:
+    """Tracks whether the FTS5 index is installed, checked once per process on first search."""
+
+    def __init__(self):
+        self._fts: Optional[bool] = None
+
+    def available(self, db: Session) -> bool:
+        if self._fts is None:
+            bind = db.get_bind()
+            self._fts = bind.dialect.name == "sqlite" and _fts_table_exists(db)
+        return self._fts
+
+    def install(self, conn: Connection) -> bool:
+        """Create the FTS5 table and triggers on SQLite, indexing existing rows once.
+
+        Returns False when the database is not SQLite or was built without
+        FTS5; searches then fall back to word-prefix matching.
+        """
+        if conn.dialect.name != "sqlite":
+            return False
+        exists = _fts_table_exists(conn)
+        try:
+            for statement in _FTS_DDL:
+                conn.execute(text(statement))
+        except OperationalError as exc:
+            if "fts5" not in str(exc).lower():
+                raise
+            return False
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        self._fts = True
+        return True
+
+    def reinstall(self, conn: Connection) -> bool:
+        """Drop the FTS5 table and triggers, then install the current definition and reindex."""
+        if conn.dialect.name != "sqlite":
+            return False
+        for trigger in _FTS_TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+        return self.install(conn)
+
+
+search_index = SearchIndex()
+
+
+def match_expression(user_id: int, terms: List[str]) -> str:
+    """FTS5 query for the user's rows requiring every term, each as a quoted prefix."""
+    words = " ".join(f'"{term}"*' for term in terms)
+    return f'user_id : "{int(user_id)}" AND description : ({words})'
+
+
+def apply_search(db: Session, query: Query, user_id: int, terms: List[str], source=Transaction) -> Query:
+    """Restrict a user's transaction query to rows matching every term, best matches first.
+
+    Each term matches as a prefix ("star" finds "Starbucks"). With FTS the
+    match is limited to the user's rows inside the index, and the results are
+    ranked by bm25 when that match set is small enough to score cheaply;
+    broad terms that match most of the user's history are served newest
+    first instead, walking the (user_id, date, id) index. The fallback matches
+    the start of any word with ILIKE and orders by recency only; it also
+    serves searches whose range reaches archived years (source is then a
+    union over the archives, which have no FTS index).
+    """
+    recent = (source.date.desc(), source.id.desc())
+    if source is Transaction and search_index.available(db):
+        match = match_expression(user_id, terms)
+        matches = db.execute(
+            text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"),
+            {"match": match},
+        ).scalar()
+        if matches <= settings.search_rank_max_matches:
+            return query.join(_fts, _fts.c.rowid == Transaction.id).filter(
+                literal_column(FTS_TABLE).op("MATCH")(match)
+            # Weight 0 for user_id: every row of the user matches it equally
+            ).order_by(func.bm25(literal_column(FTS_TABLE), 1.0, 0.0), *recent)
+        matching_ids = select(_fts.c.rowid).where(literal_column(FTS_TABLE).op("MATCH")(match))
+        return query.filter(Transaction.id.in_(matching_ids)).order_by(*recent)
+
+    for term in terms:
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(
+            or_(
+                source.description.ilike(f"{escaped}%", escape="\\"),
+                source.description.ilike(f"% {escaped}%", escape="\\")
+            )
+        )
+    return query.order_by(*recent)
@@ -0,0 +1,45 @@
+import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+
+class CategoryRow(TypedDict):
+    id: int
+    name: str
+    type: str
+    icon: Optional[str]
+    color: Optional[str]
+
+
+class TransactionRow(TypedDict):
+    id: int
+    amount: Decimal
+    date: datetime.date
+    description: Optional[str]
+    category: CategoryRow
+
+
+class TransactionPageRow(TypedDict):
+    items: List[TransactionRow]
+    next_cursor: Optional[str]
+
+
+# Same JSON as TransactionPage (Decimal as string, ISO dates), but serialized
+# straight from plain dicts in pydantic-core without building a model per row
+_page_adapter = TypeAdapter(TransactionPageRow)
+
+
+def encode_transaction_page(
+    rows: Iterable[Tuple[int, Decimal, datetime.date, Optional[str], int]],
+    categories: Dict[int, CategoryRow],
+    next_cursor: Optional[str]
+) -> bytes:
+    """Encode (id, amount, date, description, category_id) tuples as a TransactionPage body."""
+    items = [
+        {"id": id_, "amount": amount, "date": date, "description": description, "category": categories[category_id]}
+        for id_, amount, date, description, category_id in rows
+    ]
+    return _page_adapter.dump_json({"items": items, "next_cursor": next_cursor})
@@ -0,0 +1,70 @@
+"""
+Move old transactions into per-year archive tables.
+Keeps the hot transactions table (and the indexes every write maintains)
+to the last ARCHIVE_KEEP_YEARS calendar years. Reads, updates and deletes
+reach archived rows transparently; see app/services/archive.py.
+
+    python archive.py                       # archive years before the kept ones
+    python archive.py run --keep-years 2    # keep only this year and last year hot
+    python archive.py status                # rows per partition
+
+Safe while the API is running: each chunk is a short transaction. Before
+moving rows into a new year's archive it waits ARCHIVE_CATALOG_TTL_SECONDS,
+so every server process routes reads there first (--no-wait when none run).
+"""
+import argparse
+import sys
+import time
+from datetime import date
+sys.path.insert(0, '.')
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.migrations import migrate
+from app.services.archive import archive_status, archive_year, register_years, years_to_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old transactions or show partition sizes.")
+    parser.add_argument("command", nargs="?", choices=["run", "status"], default="run")
+    parser.add_argument("--keep-years", type=int, default=settings.archive_keep_years,
+                        help="Calendar years to keep hot, this one included")
+    parser.add_argument("--chunk-size", type=int, default=settings.archive_chunk_size)
+    parser.add_argument("--no-wait", action="store_true", help="Skip waiting for servers to see new archives")
+    args = parser.parse_args()
+
+    migrate(engine)
+
+    db = SessionLocal()
+    try:
+        if args.command == "status":
+            status = archive_status(db)
+            print(f"hot  {status['hot']:>10} rows")
+            for year, rows in status["archives"].items():
+                print(f"{year} {rows:>10} rows")
+            return 0
+
+        before_year = date.today().year - max(1, args.keep_years) + 1
+        years = years_to_archive(db, before_year)
+        if not years:
+            print(f"✅ Nothing dated before {before_year} left in the hot table")
+            return 0
+
+        if register_years(db, years) and not args.no_wait:
+            wait = settings.archive_catalog_ttl_seconds + 1
+            print(f"⏳ Waiting {wait:g}s for servers to start reading the new archives...")
+            time.sleep(wait)
+
+        for year in years:
+            moved = archive_year(
+                db, year, args.chunk_size,
+                lambda count: print(f"   {year}: {count} rows moved", end="\r")
+            )
+            print(f"✅ {year}: {moved} rows archived")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
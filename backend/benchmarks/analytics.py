@@ -0,0 +1,141 @@
+"""
+Compare dashboard aggregations over raw rows: SQL vs the columnar analytics cache.
+
+Seeds a throwaway SQLite database with synthetic users, then times
+build_overview over date ranges that do not cover whole months (so rollups
+cannot answer them) and build_timeseries by day and week, once with
+ANALYTICS_CACHE_MB off and once with every user's snapshot cached. Usage
+(from backend/):
+
+    python benchmarks/analytics.py
+    python benchmarks/analytics.py --users 5 --transactions 20000 --iterations 200
+    python benchmarks/analytics.py --output analytics.json
+
+Install numpy to measure the vectorized path; without it the snapshot is
+summed with Python loops. Response caching is bypassed: each iteration calls
+the dashboard service directly.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from run import _git_commit, percentile  # noqa: E402
+
+
+def _ranges(rng, count):
+    """Random ranges over the synthetic data's five years, never starting on the 1st of a month."""
+    first = date.today() - timedelta(days=5 * 365)
+    ranges = []
+    for _ in range(count):
+        start = first + timedelta(days=rng.randrange(4 * 365))
+        if start.day == 1:
+            start += timedelta(days=1)
+        ranges.append((start, start + timedelta(days=rng.randrange(30, 2 * 365))))
+    return ranges
+
+
+def _time(calls):
+    latencies = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5, help="Synthetic users to seed")
+    parser.add_argument("--transactions", type=int, default=10000, help="Transactions per synthetic user")
+    parser.add_argument("--iterations", type=int, default=100, help="Timed calls per scenario and path")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(prefix="smartfinance-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ["ANALYTICS_CACHE_MB"] = "1024"
+    os.environ["SLOW_QUERY_MS"] = "0"
+
+    from app.database import SessionLocal, engine
+    from app.migrations import migrate
+    from app.services import analytics
+    from app.services.analytics import analytics_cache
+    from app.services.dashboard import build_overview, build_timeseries
+    from seed import seed_synthetic_users
+
+    migrate(engine)
+    with SessionLocal() as db:
+        users = seed_synthetic_users(db, args.users, args.transactions, args.seed)
+
+    rng = random.Random(args.seed)
+    calls = [(rng.choice(users), start, end) for start, end in _ranges(rng, args.iterations)]
+    scenarios = {
+        "overview": lambda db, user_id, start, end: build_overview(db, user_id, start, end),
+        "timeseries/day": lambda db, user_id, start, end: build_timeseries(db, user_id, "day", start, end),
+        "timeseries/week": lambda db, user_id, start, end: build_timeseries(db, user_id, "week", start, end),
+    }
+
+    budget = analytics_cache.max_bytes
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        for user_id in users:
+            analytics_cache.snapshot(db, user_id)
+        build_seconds = time.perf_counter() - started
+
+        results = {}
+        for name, scenario in scenarios.items():
+            result = {}
+            for path, max_bytes in (("sql", 0), ("snapshot", budget)):
+                analytics_cache.max_bytes = max_bytes
+                result[path] = _time(lambda call=call: scenario(db, *call) for call in calls)
+            result["speedup"] = round(result["sql"]["mean_ms"] / result["snapshot"]["mean_ms"], 1)
+            results[name] = result
+            print(f"{name:<16} sql p50 {result['sql']['p50_ms']:>9} ms  snapshot p50 {result['snapshot']['p50_ms']:>9} ms  "
+                  f"x{result['speedup']}", file=sys.stderr)
+
+    stats = analytics_cache.stats()
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "numpy": analytics.np.__version__ if analytics.np is not None else None,
+            "users": args.users,
+            "transactions_per_user": args.transactions,
+            "iterations": args.iterations,
+        },
+        "snapshots": {
+            "build_ms_per_user": round(build_seconds * 1000 / len(users), 2),
+            "bytes": stats["bytes"],
+            "bytes_per_row": round(stats["bytes"] / (len(users) * args.transactions), 1),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
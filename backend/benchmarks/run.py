@@ -0,0 +1,345 @@
+"""
+Load-test every API endpoint in-process against a throwaway SQLite database.
+
+Seeds synthetic users (see seed.py), then drives each scenario through the
+ASGI app with httpx and reports p50/p95/p99 latency, throughput and SQL
+statements per request. Usage (from backend/):
+
+    python benchmarks/run.py                              # progress on stderr, JSON on stdout
+    python benchmarks/run.py --users 20 --transactions 20000 --requests 500
+    python benchmarks/run.py --output results.json        # machine-readable
+    python benchmarks/run.py --compare results.json       # diff against a saved run
+    python benchmarks/run.py --only dashboard             # scenarios whose name contains this
+
+Latency is measured with --concurrency requests in flight. Query counts come
+from a separate sequential pass, so statements from concurrent requests are
+not mixed together.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class Context:
+    """Per-run state shared by scenarios: users, their tokens and transaction ids."""
+
+    def __init__(self, users, rng):
+        self.users = users  # [{"id", "email", "headers", "ids"}]
+        self.rng = rng
+        self.counter = itertools.count()
+
+    def user(self):
+        return self.rng.choice(self.users)
+
+    def take_id(self, user):
+        """Pop a transaction id the scenario may modify or delete."""
+        return user["ids"].pop()
+
+    def unique(self):
+        return next(self.counter)
+
+
+def _transaction_body(rng):
+    return {
+        "amount": f"{rng.randint(100, 20000) / 100:.2f}",
+        "date": (date.today() - timedelta(days=rng.randint(0, 365))).isoformat(),
+        "category_id": rng.randint(1, 10),
+        "description": f"Benchmark #{rng.randint(1, 999)}",
+    }
+
+
+def _date_range(rng):
+    start = date.today() - timedelta(days=rng.randint(30, 900))
+    return {"start_date": start.isoformat(), "end_date": (start + timedelta(days=rng.randint(7, 365))).isoformat()}
+
+
+async def _list_second_page(client, ctx):
+    user = ctx.user()
+    first = await client.get("/api/transactions/", params={"limit": 50}, headers=user["headers"])
+    return await client.get(
+        "/api/transactions/", params={"limit": 50, "cursor": first.json()["next_cursor"]}, headers=user["headers"]
+    )
+
+
+async def _sync_changes(client, ctx):
+    """Delta sync from the user's last checkpoint; empty unless another scenario wrote."""
+    user = ctx.user()
+    if "sync" not in user:
+        user["sync"] = (await client.get("/api/transactions/changes", headers=user["headers"])).json()["next_since"]
+    response = await client.get("/api/transactions/changes", params={"since": user["sync"]}, headers=user["headers"])
+    user["sync"] = response.json()["next_since"]
+    return response
+
+
+def _bulk_csv(rng, rows=100):
+    lines = ["amount,date,category_id,description"]
+    for _ in range(rows):
+        body = _transaction_body(rng)
+        lines.append(f"{body['amount']},{body['date']},{body['category_id']},{body['description']}")
+    return "\n".join(lines) + "\n"
+
+
+# name -> async fn(client, ctx) returning the response
+SCENARIOS = {
+    "auth/login": lambda client, ctx: client.post(
+        "/api/auth/login", data={"username": ctx.user()["email"], "password": "benchmark"}
+    ),
+    "auth/register": lambda client, ctx: (lambda n: client.post(
+        "/api/auth/register",
+        json={"username": f"load_{n}", "email": f"load_{n}@example.com", "password": "benchmark"}
+    ))(ctx.unique()),
+    "auth/me": lambda client, ctx: client.get("/api/auth/me", headers=ctx.user()["headers"]),
+    "categories/all": lambda client, ctx: client.get("/api/categories/"),
+    "categories/expense": lambda client, ctx: client.get("/api/categories/expense"),
+    "transactions/list": lambda client, ctx: client.get(
+        "/api/transactions/", params={"limit": 50}, headers=ctx.user()["headers"]
+    ),
+    "transactions/list-page-2": _list_second_page,
+    "transactions/list-filtered": lambda client, ctx: client.get(
+        "/api/transactions/",
+        params={"limit": 50, "transaction_type": "expense", **_date_range(ctx.rng)},
+        headers=ctx.user()["headers"]
+    ),
+    "transactions/list-500": lambda client, ctx: client.get(
+        "/api/transactions/", params={"limit": 500}, headers=ctx.user()["headers"]
+    ),
+    "transactions/search": lambda client, ctx: client.get(
+        "/api/transactions/search", params={"q": ctx.rng.choice(["star", "uber", "whole foods", "net"])},
+        headers=ctx.user()["headers"]
+    ),
+    "transactions/changes": _sync_changes,
+    "transactions/get": lambda client, ctx: (lambda user: client.get(
+        f"/api/transactions/{user['ids'][ctx.rng.randrange(len(user['ids']))]}", headers=user["headers"]
+    ))(ctx.user()),
+    "transactions/create": lambda client, ctx: client.post(
+        "/api/transactions/", json=_transaction_body(ctx.rng), headers=ctx.user()["headers"]
+    ),
+    "transactions/update": lambda client, ctx: (lambda user: client.put(
+        f"/api/transactions/{ctx.take_id(user)}", json={"amount": "12.34"}, headers=user["headers"]
+    ))(ctx.user()),
+    "transactions/delete": lambda client, ctx: (lambda user: client.delete(
+        f"/api/transactions/{ctx.take_id(user)}", headers=user["headers"]
+    ))(ctx.user()),
+    "transactions/batch-50": lambda client, ctx: client.post(
+        "/api/transactions/batch",
+        json={"operations": [{"op": "create", "data": _transaction_body(ctx.rng)} for _ in range(50)]},
+        headers=ctx.user()["headers"]
+    ),
+    "transactions/bulk-100": lambda client, ctx: client.post(
+        "/api/transactions/bulk", content=_bulk_csv(ctx.rng),
+        headers={**ctx.user()["headers"], "Content-Type": "text/csv"}
+    ),
+    "transactions/export-csv": lambda client, ctx: client.get(
+        "/api/transactions/export", params={"format": "csv", **_date_range(ctx.rng)}, headers=ctx.user()["headers"]
+    ),
+    "dashboard/overview": lambda client, ctx: client.get("/api/dashboard/overview", headers=ctx.user()["headers"]),
+    "dashboard/overview-ranged": lambda client, ctx: client.get(
+        "/api/dashboard/overview", params=_date_range(ctx.rng), headers=ctx.user()["headers"]
+    ),
+    "dashboard/summary": lambda client, ctx: client.get("/api/dashboard/summary", headers=ctx.user()["headers"]),
+    "dashboard/chart": lambda client, ctx: client.get("/api/dashboard/chart", headers=ctx.user()["headers"]),
+    "dashboard/income-chart": lambda client, ctx: client.get(
+        "/api/dashboard/income-chart", headers=ctx.user()["headers"]
+    ),
+    "dashboard/timeseries": lambda client, ctx: client.get(
+        "/api/dashboard/timeseries", params={"period": ctx.rng.choice(["day", "week", "month"])},
+        headers=ctx.user()["headers"]
+    ),
+    "health": lambda client, ctx: client.get("/api/health"),
+}
+
+# Password hashing dominates these; fewer requests keep runs short
+SLOW_SCENARIOS = {"auth/login": 0.2, "auth/register": 0.2, "transactions/bulk-100": 0.5, "transactions/export-csv": 0.5}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, ctx, scenario, requests, concurrency):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await scenario(client, ctx)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+async def count_scenario_queries(client, ctx, scenario, samples):
+    from app.database import count_queries
+
+    counts = []
+    for _ in range(samples):
+        with count_queries() as counter:
+            await scenario(client, ctx)
+        counts.append(counter.count)
+    return round(statistics.fmean(counts), 2)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    """Print p50/p95 and queries-per-request changes against a saved run."""
+    print(f"\nCompared with {previous['meta'].get('commit')} ({previous['meta'].get('started_at')}):")
+    print(f"{'scenario':<28} {'p50 ms':>18} {'p95 ms':>18} {'queries':>12}")
+    for name, result in current["results"].items():
+        before = previous["results"].get(name)
+        if not before:
+            continue
+
+        def change(key):
+            old, new = before.get(key), result.get(key)
+            if old is None or new is None:
+                return "n/a"
+            pct = (new - old) / old * 100 if old else 0.0
+            return f"{old}->{new} ({pct:+.0f}%)"
+
+        print(f"{name:<28} {change('p50_ms'):>18} {change('p95_ms'):>18} {change('queries_per_request'):>12}")
+
+
+async def main_async(args, ctx):
+    import httpx
+    from app.main import app, include_routers
+
+    include_routers(app)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, scenario in SCENARIOS.items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            requests = max(2, int(args.requests * SLOW_SCENARIOS.get(name, 1)))
+            await run_scenario(client, ctx, scenario, min(requests, args.warmup), args.concurrency)
+            result = await run_scenario(client, ctx, scenario, requests, args.concurrency)
+            result["queries_per_request"] = await count_scenario_queries(client, ctx, scenario, args.query_samples)
+            results[name] = result
+            if not args.quiet:
+                print(f"{name:<28} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+                      f"p99 {result['p99_ms']:>8} ms  {result['throughput_rps']:>8} req/s  "
+                      f"{result['queries_per_request']:>6} q/req  {result['errors']} errors", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5, help="Synthetic users to seed")
+    parser.add_argument("--transactions", type=int, default=2000, help="Transactions per synthetic user")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per scenario first")
+    parser.add_argument("--query-samples", type=int, default=5, help="Sequential requests used to count queries")
+    parser.add_argument("--only", nargs="*", help="Run only scenarios whose name contains one of these")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", help="SQLite file to use (default: a fresh temporary file)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix="smartfinance-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+
+    # Imported after DATABASE_URL is set: the app binds its engine at import time
+    from sqlalchemy import select
+    from app.database import SessionLocal, engine
+    from app.migrations import migrate
+    from app.models.transaction import Transaction
+    from app.models.user import User
+    from app.services.auth import create_access_token
+    from seed import seed_synthetic_users
+
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    seed_started = time.perf_counter()
+    # ASGITransport does not run the app's lifespan, so migrate up front
+    migrate(engine)
+    with SessionLocal() as db:
+        user_ids = seed_synthetic_users(db, args.users, args.transactions, args.seed)
+        users = []
+        for user_id in user_ids:
+            ids = list(db.scalars(select(Transaction.id).where(Transaction.user_id == user_id)))
+            users.append({
+                "id": user_id,
+                "email": db.scalar(select(User.email).where(User.id == user_id)),
+                "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"},
+                "ids": ids,
+            })
+    seed_seconds = round(time.perf_counter() - seed_started, 2)
+
+    rng = random.Random(args.seed)
+    for user in users:
+        rng.shuffle(user["ids"])
+    results = asyncio.run(main_async(args, Context(users, rng)))
+
+    report = {
+        "meta": {
+            "started_at": started_at,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "users": args.users,
+            "transactions_per_user": args.transactions,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed_seconds": seed_seconds,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    if not args.output and not args.compare:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compare the default and fast serialization paths of GET /api/transactions.
+
+Builds a throwaway SQLite database, inserts N transactions for one user and
+fetches them as a single page through the ASGI app, with FAST_SERIALIZATION
+off and on. Usage (from backend/):
+
+    python benchmarks/serialization.py --rows 1000 10000 100000
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed requests per path and size")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="smartfinance-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["TRANSACTIONS_MAX_PAGE_SIZE"] = str(max(args.rows))
+
+    from fastapi.testclient import TestClient
+    from app.config import settings
+    from app.database import SessionLocal, engine
+    from app.main import app, include_routers
+    from app.migrations import migrate
+    from app.models.transaction import Transaction
+
+    # The client is used without its context manager, which skips the lifespan
+    migrate(engine)
+    include_routers(app)
+    client = TestClient(app)
+    response = client.post(
+        "/api/auth/register",
+        json={"username": "bench", "email": "bench@example.com", "password": "benchmark"}
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    user_id = client.get("/api/auth/me", headers=headers).json()["id"]
+
+    rng = random.Random(42)
+    inserted = 0
+    results = []
+    for rows in sorted(args.rows):
+        with SessionLocal() as db:
+            db.execute(Transaction.__table__.insert(), [
+                {
+                    "amount": Decimal(rng.randint(100, 50000)) / 100,
+                    "date": datetime.date(2020, 1, 1) + datetime.timedelta(days=rng.randint(0, 1800)),
+                    "description": f"Merchant {rng.randint(1, 5000)}",
+                    "category_id": rng.randint(1, 15),
+                    "user_id": user_id,
+                }
+                for _ in range(rows - inserted)
+            ])
+            db.commit()
+        inserted = rows
+
+        bodies = {}
+        for fast in (False, True):
+            settings.fast_serialization = fast
+            timings = []
+            for _ in range(args.repeat + 1):
+                started = time.perf_counter()
+                response = client.get("/api/transactions/", params={"limit": rows}, headers=headers)
+                timings.append(time.perf_counter() - started)
+                response.raise_for_status()
+            bodies[fast] = response.json()
+            # The first request warms caches and is not counted
+            results.append({
+                "rows": rows,
+                "path": "fast" if fast else "default",
+                "median_ms": round(statistics.median(timings[1:]) * 1000, 1),
+                "rows_per_second": round(rows / statistics.median(timings[1:])),
+                "bytes": len(response.content),
+            })
+        if bodies[False] != bodies[True]:
+            raise SystemExit(f"Fast path output differs from the default path at {rows} rows")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'rows':>8} {'path':>8} {'median ms':>10} {'rows/s':>10} {'bytes':>10}")
+    for result in results:
+        print(f"{result['rows']:>8} {result['path']:>8} {result['median_ms']:>10} "
+              f"{result['rows_per_second']:>10} {result['bytes']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Measure how throughput scales with server worker processes.
+
+Seeds a SQLite (WAL) database once, then for each worker count starts
+`uvicorn app.main:app --workers N` on a local port and drives a mixed read
+and write workload over real HTTP for a fixed time. Usage (from backend/):
+
+    python benchmarks/workers.py                           # 1, 2 and 4 workers
+    python benchmarks/workers.py --workers 1 2 4 8 --duration 20 --clients 4
+    python benchmarks/workers.py --server gunicorn         # forked workers (needs gunicorn, uvicorn-worker)
+    python benchmarks/workers.py --output scaling.json
+
+Load comes from --clients separate processes so the generator is not the
+bottleneck, but it shares the machine with the server: with C cores,
+workers + clients above C measures contention rather than scaling.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from run import SCENARIOS, Context, _git_commit, percentile  # noqa: E402
+
+# scenario -> relative weight; mostly reads, as a dashboard-heavy client would send
+WORKLOAD = {
+    "auth/me": 2,
+    "categories/all": 1,
+    "transactions/list": 4,
+    "transactions/search": 1,
+    "transactions/create": 1,
+    "dashboard/overview": 3,
+    "dashboard/timeseries": 1,
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(server, workers, port, env):
+    if server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"]
+        env = {**env, "BIND": f"127.0.0.1:{port}"}
+    else:
+        command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    return subprocess.Popen(
+        command, env={**env, "WEB_CONCURRENCY": str(workers)},
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+
+
+def _wait_until_ready(base_url, process, timeout=60):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited early:\n{process.stderr.read()}")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def _drive(base_url, users, seed, concurrency, duration):
+    import httpx
+
+    ctx = Context(users, random.Random(seed))
+    names = list(WORKLOAD)
+    weights = [WORKLOAD[name] for name in names]
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def loop(client):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            scenario = SCENARIOS[ctx.rng.choices(names, weights)[0]]
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await asyncio.gather(*(loop(client) for _ in range(concurrency)))
+    return latencies, errors
+
+
+def _client_process(args):
+    return asyncio.run(_drive(*args))
+
+
+def measure(base_url, users, args):
+    """Run the workload from --clients processes; returns throughput and latency."""
+    per_client = max(1, args.concurrency // args.clients)
+    jobs = [(base_url, users, args.seed + number, per_client, args.duration) for number in range(args.clients)]
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+        outcomes = pool.map(_client_process, jobs)
+    elapsed = time.perf_counter() - started
+    latencies = sorted(value for values, _ in outcomes for value in values)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in outcomes),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to try")
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--users", type=int, default=10, help="Synthetic users to seed")
+    parser.add_argument("--transactions", type=int, default=2000, help="Transactions per synthetic user")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per worker count")
+    parser.add_argument("--warmup", type=float, default=2, help="Untimed seconds of load first")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight across all clients")
+    parser.add_argument("--clients", type=int, default=2, help="Load generator processes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(prefix="smartfinance-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+
+    from sqlalchemy import select
+    from app.database import SessionLocal, engine
+    from app.migrations import migrate
+    from app.models.transaction import Transaction
+    from app.models.user import User
+    from app.services.auth import create_access_token
+    from seed import seed_synthetic_users
+
+    migrate(engine)
+    with SessionLocal() as db:
+        users = [
+            {
+                "id": user_id,
+                "email": db.scalar(select(User.email).where(User.id == user_id)),
+                "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"},
+                "ids": list(db.scalars(select(Transaction.id).where(Transaction.user_id == user_id))),
+            }
+            for user_id in seed_synthetic_users(db, args.users, args.transactions, args.seed)
+        ]
+    engine.dispose()
+
+    # Servers share the seeded database; migrations are already applied
+    env = {**os.environ, "AUTO_MIGRATE": "false", "SLOW_QUERY_MS": "0"}
+    results = {}
+    for workers in args.workers:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        process = _start_server(args.server, workers, port, env)
+        try:
+            _wait_until_ready(base_url, process)
+            if args.warmup:
+                measure(base_url, users, argparse.Namespace(**{**vars(args), "duration": args.warmup}))
+            result = measure(base_url, users, args)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        baseline = next(iter(results.values()), result)["throughput_rps"]
+        result["speedup"] = round(result["throughput_rps"] / baseline, 2)
+        results[workers] = result
+        print(f"{workers:>3} workers  {result['throughput_rps']:>8} req/s  x{result['speedup']:<5} "
+              f"p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  {result['errors']} errors",
+              file=sys.stderr)
+
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "server": args.server,
+            "users": args.users,
+            "transactions_per_user": args.transactions,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "clients": args.clients,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
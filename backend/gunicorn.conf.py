@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for running SmartFinance with several worker processes.
+
+    pip install gunicorn uvicorn-worker
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py app.main:app
+
+Migrations run once in the master before any worker starts, and the app is
+preloaded so workers fork with routers and models already imported. Each
+worker drops the inherited database connections after fork (see
+app/database.py) and sizes its pool from WEB_CONCURRENCY.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+graceful_timeout = 30
+keepalive = 5
+
+# Settings are read once on import; make the pool split match the worker count
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+
+def on_starting(server):
+    from app.config import settings
+    from app.database import engine
+    from app.main import app, include_routers
+    from app.migrations import migrate
+
+    # Import the routers before forking, so workers share them
+    include_routers(app)
+    for description in migrate(engine):
+        server.log.info("Migration applied: %s", description)
+    # Already up to date; workers skip the check in their lifespan
+    settings.auto_migrate = False
@@ -0,0 +1,38 @@
+"""
+Schema migrations for SmartFinance.
+Creates tables, indexes and the search index, and seeds default categories.
+The API applies pending migrations at startup unless AUTO_MIGRATE=false.
+
+    python migrate.py           # apply pending migrations
+    python migrate.py status    # show the applied version
+"""
+import argparse
+import sys
+sys.path.insert(0, '.')
+
+from app.database import engine
+from app.migrations import LATEST_VERSION, MIGRATIONS, current_version, migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or inspect database migrations.")
+    parser.add_argument("command", nargs="?", choices=["apply", "status"], default="apply")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        with engine.connect() as conn:
+            version = current_version(conn)
+        for number, (description, _) in enumerate(MIGRATIONS, start=1):
+            print(f"{'✅' if number <= version else '⏳'} {number:3d} {description}")
+        print(f"\nSchema version {version} of {LATEST_VERSION}")
+        return 0 if version >= LATEST_VERSION else 1
+
+    applied = migrate(engine)
+    for description in applied:
+        print(f"✅ {description}")
+    print("✅ Database is up to date" if applied else "Database already up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Monthly rollup maintenance for SmartFinance.
+Rebuild rollups from raw transactions, or verify that they still match.
+
+    python rollups.py rebuild [--user USER_ID]
+    python rollups.py verify [--user USER_ID]
+"""
+import argparse
+import sys
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal, engine
+from app.migrations import migrate
+from app.services.rollup import rebuild_rollups, verify_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify monthly rollups.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--user", type=int, default=None, help="Limit to one user id")
+    args = parser.parse_args()
+
+    migrate(engine)
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rebuild_rollups(db, args.user)
+            db.commit()
+            print("✅ Monthly rollups rebuilt")
+            return 0
+
+        problems = verify_rollups(db, args.user)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            print(f"\n{len(problems)} rollup bucket(s) out of date, run 'python rollups.py rebuild'")
+            return 1
+        print("✅ Monthly rollups match transactions")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
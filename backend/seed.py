@@ -1,41 +1,25 @@
 """
 Database seeder script for SmartFinance.
-Run this after creating the database to seed initial categories.
+Applies pending migrations, then seeds categories and a demo user.
+
+    python seed.py                                   # categories + demo user
+    python seed.py --synthetic-users 20 --transactions-per-user 5000
 """
+import argparse
+import random
 import sys
+from datetime import date, timedelta
+from decimal import Decimal
 sys.path.insert(0, '.')
 
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal, engine
+from app.migrations import DEFAULT_CATEGORIES, migrate
 from app.models.category import Category
 from app.models.user import User
-from app.models.transaction import Transaction  # Import to register the model
+from app.models.transaction import Transaction
 from app.services.auth import get_password_hash
-
-# Create tables
-Base.metadata.create_all(bind=engine)
-
-# Predefined categories
-CATEGORIES = [
-    # Expense categories
-    {"name": "Food & Dining", "type": "expense", "icon": "🍔", "color": "#EF4444"},
-    {"name": "Transportation", "type": "expense", "icon": "🚗", "color": "#F59E0B"},
-    {"name": "Shopping", "type": "expense", "icon": "🛍️", "color": "#EC4899"},
-    {"name": "Entertainment", "type": "expense", "icon": "🎬", "color": "#8B5CF6"},
-    {"name": "Bills & Utilities", "type": "expense", "icon": "💡", "color": "#6366F1"},
-    {"name": "Healthcare", "type": "expense", "icon": "🏥", "color": "#14B8A6"},
-    {"name": "Education", "type": "expense", "icon": "📚", "color": "#0EA5E9"},
-    {"name": "Travel", "type": "expense", "icon": "✈️", "color": "#F97316"},
-    {"name": "Groceries", "type": "expense", "icon": "🛒", "color": "#22C55E"},
-    {"name": "Other Expense", "type": "expense", "icon": "📦", "color": "#6B7280"},
-    
-    # Income categories
-    {"name": "Salary", "type": "income", "icon": "💼", "color": "#10B981"},
-    {"name": "Freelance", "type": "income", "icon": "💻", "color": "#06B6D4"},
-    {"name": "Investments", "type": "income", "icon": "📈", "color": "#8B5CF6"},
-    {"name": "Gifts", "type": "income", "icon": "🎁", "color": "#F43F5E"},
-    {"name": "Other Income", "type": "income", "icon": "💰", "color": "#84CC16"},
-]
-
+from app.services.data_version import bump_data_version
+from app.services.rollup import rebuild_rollups
 
 def seed_categories(db):
     """Seed default categories."""
@@ -44,12 +28,12 @@ def seed_categories(db):
         print("Categories already exist, skipping...")
         return
     
-    for cat_data in CATEGORIES:
+    for cat_data in DEFAULT_CATEGORIES:
         category = Category(**cat_data)
         db.add(category)
     
     db.commit()
-    print(f"✅ {len(CATEGORIES)} categories seeded successfully!")
+    print(f"✅ {len(DEFAULT_CATEGORIES)} categories seeded successfully!")
 
 
 def seed_demo_user(db):
@@ -69,13 +53,82 @@ def seed_demo_user(db):
     print("✅ Demo user created: demo@smartfinance.com / demo123")
 
 
+SYNTHETIC_MERCHANTS = [
+    "Starbucks", "Whole Foods", "Shell", "Uber", "Amazon", "Netflix", "Spotify",
+    "Target", "Walgreens", "Delta Air Lines", "Chipotle", "Home Depot", "Costco",
+]
+
+
+def seed_synthetic_users(db, users: int, transactions_per_user: int, rng_seed: int = 42, password: str = "benchmark"):
+    """Create users bench_0001... with random transactions over the last five years.
+    
+    Transactions go in with Core executemany and rollups are rebuilt once at
+    the end, so large volumes load quickly. Like the write endpoints, each
+    user's load bumps their data version and stamps the rows with it, so
+    caches keyed on the version and the sync feed see the new data. Returns
+    the new users' ids.
+    """
+    rng = random.Random(rng_seed)
+    categories = db.query(Category.id, Category.type).all()
+    expense_ids = [c.id for c in categories if c.type == "expense"]
+    income_ids = [c.id for c in categories if c.type == "income"]
+    start = date.today() - timedelta(days=5 * 365)
+    # Hashing is deliberately slow; every synthetic user shares one hash
+    password_hash = get_password_hash(password)
+    
+    first = db.query(User).filter(User.username.like("bench_%")).count() + 1
+    user_ids = []
+    for number in range(first, first + users):
+        user = User(
+            username=f"bench_{number:04d}",
+            email=f"bench_{number:04d}@example.com",
+            password_hash=password_hash
+        )
+        db.add(user)
+        db.flush()
+        user_ids.append(user.id)
+        version = bump_data_version(db, user.id)
+        
+        rows = []
+        for _ in range(transactions_per_user):
+            income = rng.random() < 0.1
+            rows.append({
+                "user_id": user.id,
+                "category_id": rng.choice(income_ids if income else expense_ids),
+                "amount": Decimal(rng.randint(500, 500000) if income else rng.randint(100, 30000)) / 100,
+                "date": start + timedelta(days=rng.randint(0, 5 * 365)),
+                "description": None if income else f"{rng.choice(SYNTHETIC_MERCHANTS)} #{rng.randint(1, 999)}",
+                "version": version,
+            })
+            if len(rows) == 5000:
+                db.execute(Transaction.__table__.insert(), rows)
+                rows = []
+        if rows:
+            db.execute(Transaction.__table__.insert(), rows)
+        rebuild_rollups(db, user.id)
+        db.commit()
+    
+    print(f"✅ {users} synthetic users with {transactions_per_user} transactions each "
+          f"(password: {password})")
+    return user_ids
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Seed the SmartFinance database.")
+    parser.add_argument("--synthetic-users", type=int, default=0, help="Also create this many bench_NNNN users")
+    parser.add_argument("--transactions-per-user", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic data")
+    args = parser.parse_args()
+    
     print("🌱 Seeding SmartFinance database...")
+    migrate(engine)
     
     db = SessionLocal()
     try:
         seed_categories(db)
         seed_demo_user(db)
+        if args.synthetic_users:
+            seed_synthetic_users(db, args.synthetic_users, args.transactions_per_user, args.seed)
         print("\n🎉 Database seeding complete!")
     finally:
         db.close()
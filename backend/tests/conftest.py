@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='smartfinance-tests-')}/test.db"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def headers(client):
+    """Auth headers for a freshly registered user, so each test starts with no transactions."""
+    name = f"user_{uuid.uuid4().hex[:12]}"
+    response = client.post(
+        "/api/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "secret123"}
+    )
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def categories(client):
+    return client.get("/api/categories/").json()
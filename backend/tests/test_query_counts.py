@@ -0,0 +1,111 @@
+"""Statements issued per transaction endpoint, counted with app.database.count_queries.
+
+Categories are loaded in the same statement as the transactions, so the counts
+must not grow with the number of rows or distinct categories returned.
+"""
+import pytest
+
+from app.database import count_queries
+
+
+def _create(client, headers, categories, count):
+    ids = []
+    for i in range(count):
+        category = categories[i % len(categories)]
+        response = client.post("/api/transactions/", headers=headers, json={
+            "amount": 10 + i,
+            "description": f"transaction {i}",
+            "category_id": category["id"],
+            "date": f"2024-01-{i % 28 + 1:02d}",
+        })
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def _count(call):
+    # Warm per-process caches (token user, archive years) so only the endpoint's own statements are counted.
+    call()
+    with count_queries() as counter:
+        response = call()
+    assert response.status_code < 300, response.text
+    return counter
+
+
+def _category_selects(counter):
+    return [s for s in counter.statements if s.lstrip().upper().startswith("SELECT") and "FROM categories" in s]
+
+
+@pytest.mark.parametrize("url", [
+    "/api/transactions/",
+    "/api/transactions/?transaction_type=expense",
+    "/api/transactions/search?q=transaction",
+])
+def test_list_does_not_load_categories_per_row(client, headers, categories, url):
+    expenses = [category for category in categories if category["type"] == "expense"]
+    _create(client, headers, expenses, 1)
+    one = _count(lambda: client.get(url, headers=headers))
+
+    _create(client, headers, expenses, 19)
+    many = _count(lambda: client.get(url, headers=headers))
+
+    assert len(client.get(url, headers=headers).json()["items"]) == 20
+    assert many.count == one.count
+    assert many.count <= 2
+    assert not _category_selects(many)
+
+
+def test_get_is_one_statement(client, headers, categories):
+    (transaction_id,) = _create(client, headers, categories, 1)
+    counter = _count(lambda: client.get(f"/api/transactions/{transaction_id}", headers=headers))
+
+    assert counter.count == 1
+    assert not _category_selects(counter)
+
+
+def test_create_returns_category_without_lazy_load(client, headers, categories):
+    category = categories[0]
+    with count_queries() as counter:
+        response = client.post("/api/transactions/", headers=headers, json={
+            "amount": 12.5, "description": "lunch", "category_id": category["id"], "date": "2024-03-01",
+        })
+    assert response.status_code == 201, response.text
+    assert response.json()["category"]["id"] == category["id"]
+    assert not _category_selects(counter)
+    assert counter.count <= 5
+
+
+def test_update_returns_category_without_lazy_load(client, headers, categories):
+    (transaction_id,) = _create(client, headers, categories, 1)
+    other = next(c for c in categories if c["type"] == categories[0]["type"] and c["id"] != categories[0]["id"])
+
+    with count_queries() as counter:
+        response = client.put(f"/api/transactions/{transaction_id}", headers=headers,
+                              json={"amount": 99, "category_id": other["id"]})
+    assert response.status_code == 200, response.text
+    assert response.json()["category"]["id"] == other["id"]
+    assert not _category_selects(counter)
+    assert counter.count <= 6
+
+
+def test_batch_creates_in_one_insert(client, headers, categories):
+    def batch(count):
+        operations = [
+            {"op": "create", "data": {
+                "amount": i + 1, "description": f"batch {count} {i}",
+                "category_id": categories[i % len(categories)]["id"], "date": "2024-04-01",
+            }}
+            for i in range(count)
+        ]
+        with count_queries() as counter:
+            response = client.post("/api/transactions/batch", headers=headers, json={"operations": operations})
+        assert response.status_code == 200, response.text
+        return counter, response.json()["created"]
+
+    one, _ = batch(1)
+    many, created = batch(10)
+
+    assert many.count == one.count
+    assert sum(s.lstrip().startswith("INSERT INTO transactions ") for s in many.statements) == 1
+    for i, transaction_id in enumerate(created):
+        assert client.get(f"/api/transactions/{transaction_id}", headers=headers).json()["description"] == f"batch 10 {i}"
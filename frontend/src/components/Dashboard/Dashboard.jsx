@@ -1,5 +1,5 @@
-import { useState, useEffect } from 'react';
-import { getDashboardSummary, getExpenseChart } from '../../services/api';
+import { useState, useEffect, useRef } from 'react';
+import { getDashboardOverview, dashboardStreamUrl } from '../../services/api';
 import ExpenseChart from './ExpenseChart';
 import './Dashboard.css';
 
@@ -11,22 +11,62 @@ const Dashboard = () => {
     });
     const [chartData, setChartData] = useState([]);
     const [loading, setLoading] = useState(true);
+    // Data version the shown dashboard reflects; null while an overview fetch is in flight
+    const version = useRef(null);
+    const pending = useRef([]);
 
     useEffect(() => {
         fetchDashboardData();
+
+        // Writes are pushed to us instead of polling; EventSource reconnects on its own
+        const source = new EventSource(dashboardStreamUrl());
+        source.addEventListener('dashboard', (e) => receiveDashboardEvent(JSON.parse(e.data)));
+        source.addEventListener('resync', () => fetchDashboardData());
+        return () => source.close();
     }, []);
 
+    const receiveDashboardEvent = (event) => {
+        if (version.current === null) {
+            pending.current.push(event);
+        } else {
+            applyDashboardEvent(event);
+        }
+    };
+
+    const applyDashboardEvent = (event) => {
+        // The overview (or an earlier event) already includes this write
+        if (event.version <= version.current) {
+            return;
+        }
+        version.current = event.version;
+        setSummary(event.summary);
+        setChartData((chart) => {
+            const next = chart.map((item) => ({ ...item }));
+            event.changes.filter((change) => change.type === 'expense').forEach((change) => {
+                const item = next.find((entry) => entry.category === change.category);
+                if (item) {
+                    item.amount = (parseFloat(item.amount) + parseFloat(change.amount)).toFixed(2);
+                } else {
+                    next.push({ category: change.category, amount: change.amount, color: change.color });
+                }
+            });
+            return next.filter((item) => parseFloat(item.amount) !== 0);
+        });
+    };
+
     const fetchDashboardData = async () => {
+        version.current = null;
         try {
-            const [summaryRes, chartRes] = await Promise.all([
-                getDashboardSummary(),
-                getExpenseChart()
-            ]);
-            setSummary(summaryRes.data);
-            setChartData(chartRes.data);
+            const overviewRes = await getDashboardOverview();
+            setSummary(overviewRes.data.summary);
+            setChartData(overviewRes.data.expense_chart);
+            version.current = overviewRes.data.data_version;
         } catch (error) {
             console.error('Error fetching dashboard data:', error);
+            version.current = 0;
         } finally {
+            // Events that arrived while fetching, minus the ones the overview already counts
+            pending.current.splice(0).forEach(applyDashboardEvent);
             setLoading(false);
         }
     };
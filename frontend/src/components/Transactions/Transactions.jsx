@@ -1,10 +1,12 @@
 import { useState, useEffect } from 'react';
-import { getTransactions, getCategories, createTransaction, deleteTransaction } from '../../services/api';
+import { getTransactions, getTransactionChanges, getCategories, createTransaction, deleteTransaction } from '../../services/api';
 import TransactionForm from './TransactionForm';
 import './Transactions.css';
 
 const Transactions = () => {
     const [transactions, setTransactions] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [syncToken, setSyncToken] = useState(null);
     const [categories, setCategories] = useState([]);
     const [loading, setLoading] = useState(true);
     const [showForm, setShowForm] = useState(false);
@@ -33,9 +35,13 @@ const Transactions = () => {
             if (dateFilter.start_date) params.start_date = dateFilter.start_date;
             if (dateFilter.end_date) params.end_date = dateFilter.end_date;
 
+            // Checkpoint first: changes made while the list loads come back in the next sync
+            const syncRes = await getTransactionChanges();
             const transRes = await getTransactions(params);
             console.log('Transactions response:', transRes.data);
-            setTransactions(transRes.data);
+            setSyncToken(syncRes.data.next_since);
+            setTransactions(transRes.data.items);
+            setNextCursor(transRes.data.next_cursor);
         } catch (error) {
             console.error('Error fetching transactions:', error);
         } finally {
@@ -43,6 +49,57 @@ const Transactions = () => {
         }
     };
 
+    const handleLoadMore = async () => {
+        try {
+            const params = { cursor: nextCursor };
+            if (dateFilter.start_date) params.start_date = dateFilter.start_date;
+            if (dateFilter.end_date) params.end_date = dateFilter.end_date;
+
+            const transRes = await getTransactions(params);
+            setTransactions([...transactions, ...transRes.data.items]);
+            setNextCursor(transRes.data.next_cursor);
+        } catch (error) {
+            console.error('Error fetching more transactions:', error);
+        }
+    };
+
+    // Newest first, like the API: by date, then id
+    const compareTransactions = (a, b) => (
+        a.date === b.date ? b.id - a.id : (a.date < b.date ? 1 : -1)
+    );
+
+    const syncChanges = async () => {
+        try {
+            let since = syncToken;
+            let merged = transactions;
+            let more = true;
+            while (more) {
+                const { data } = await getTransactionChanges(since);
+                const deleted = new Set(data.deleted);
+                const changed = new Map(data.items.map((item) => [item.id, item]));
+                const last = merged[merged.length - 1];
+                const visible = data.items.filter((item) => (
+                    (!dateFilter.start_date || item.date >= dateFilter.start_date) &&
+                    (!dateFilter.end_date || item.date <= dateFilter.end_date) &&
+                    // Rows past the loaded pages arrive with "Load More"
+                    (!nextCursor || !last || compareTransactions(item, last) <= 0)
+                ));
+                merged = merged
+                    .filter((item) => !deleted.has(item.id) && !changed.has(item.id))
+                    .concat(visible)
+                    .sort(compareTransactions);
+                since = data.next_since;
+                more = data.has_more;
+            }
+            setTransactions(merged);
+            setSyncToken(since);
+        } catch (error) {
+            // e.g. 410 when the checkpoint is no longer valid
+            console.error('Error syncing transactions:', error);
+            fetchData();
+        }
+    };
+
     const handleFilter = () => {
         setLoading(true);
         fetchData();
@@ -52,7 +109,7 @@ const Transactions = () => {
         try {
             await createTransaction(data);
             setShowForm(false);
-            fetchData();
+            syncChanges();
         } catch (error) {
             console.error('Error creating transaction:', error);
         }
@@ -62,7 +119,7 @@ const Transactions = () => {
         if (window.confirm('Are you sure you want to delete this transaction?')) {
             try {
                 await deleteTransaction(id);
-                fetchData();
+                syncChanges();
             } catch (error) {
                 console.error('Error deleting transaction:', error);
             }
@@ -145,6 +202,9 @@ const Transactions = () => {
                             </div>
                         ))
                     )}
+                    {nextCursor && (
+                        <button className="btn-filter" onClick={handleLoadMore}>Load More</button>
+                    )}
                 </div>
             )}
 
@@ -22,17 +22,28 @@ export const login = (credentials) => {
     return API.post('/auth/login', formData);
 };
 export const getCurrentUser = () => API.get('/auth/me');
+// 204 when done, or 202 with a job to poll through getAccountDeletion for large accounts
+export const deleteAccount = () => API.delete('/auth/me');
+export const getAccountDeletion = (id) => API.get(`/auth/deletions/${id}`);
 
 // Dashboard API
+export const getDashboardOverview = (params) => API.get('/dashboard/overview', { params });
+export const getDashboardTimeseries = (params) => API.get('/dashboard/timeseries', { params });
 export const getDashboardSummary = () => API.get('/dashboard/summary');
 export const getExpenseChart = () => API.get('/dashboard/chart');
 export const getIncomeChart = () => API.get('/dashboard/income-chart');
+// EventSource cannot send headers, so the token goes in the query string
+export const dashboardStreamUrl = () =>
+    `${API.defaults.baseURL}/dashboard/stream?access_token=${encodeURIComponent(localStorage.getItem('token') || '')}`;
 
 // Transactions API
 export const getTransactions = (params) => API.get('/transactions', { params });
+export const searchTransactions = (params) => API.get('/transactions/search', { params });
+export const getTransactionChanges = (since) => API.get('/transactions/changes', { params: since ? { since } : {} });
 export const createTransaction = (data) => API.post('/transactions', data);
 export const updateTransaction = (id, data) => API.put(`/transactions/${id}`, data);
 export const deleteTransaction = (id) => API.delete(`/transactions/${id}`);
+export const batchTransactions = (operations) => API.post('/transactions/batch', { operations });
 
 // Categories API
 export const getCategories = () => API.get('/categories/');